@@ -1,19 +1,22 @@
 import streamlit as st
-import openai
 import os
+import asyncio
+import weakref
 from dotenv import load_dotenv
-from typing import Optional, List, Dict
-from datetime import datetime
+from typing import Final, Optional, List, Dict
 import io
-from docx import Document
-import pdfplumber
+import re
+import time
+import codecs
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 
 # Load environment variables
 load_dotenv()
 
 # Career Buddy Configuration
-CAREER_BUDDY_SYSTEM_PROMPT = """
+# Sent byte-identical as the first message of every request so Azure OpenAI can reuse its prompt cache
+CAREER_BUDDY_SYSTEM_PROMPT: Final[str] = """
 You are a Career Buddy, an expert career advisor and resume analyst. Your role is to:
 
 1. **Resume Analysis**: Analyze uploaded resumes and provide detailed feedback on:
@@ -40,14 +43,50 @@ Always provide actionable, specific, and encouraging advice. When analyzing file
 Keep your responses conversational and engaging, as you're having an ongoing chat with the user.
 """
 
+# Optional prompt cache routing key, only sent when set: API versions before prompt_cache_key and
+# non-OpenAI deployments reject the field, and Azure only caches prefixes of 1024+ tokens
+# (the system prompt alone is shorter; with a pinned resume it usually isn't)
+PROMPT_CACHE_KEY: Final[Optional[str]] = os.getenv("AZURE_OPENAI_PROMPT_CACHE_KEY") or None
+
+# Response length budgets: short-form asks don't need the full ceiling
+DEFAULT_MAX_TOKENS = 2000
+QUICK_PROMPT_MAX_TOKENS = 400
+RESUME_ANALYSIS_MAX_TOKENS = 1200
+CHAT_STOP_SEQUENCES = ["\n\nUser:", "</end>"]
+# Reasoning deployments count their hidden reasoning toward max_tokens and don't support stop sequences,
+# so their budgets are scaled up and stop is left out
+REASONING_MODEL_PREFIXES = ("deepseek-r1", "o1", "o3", "o4")
+REASONING_MAX_TOKENS_FACTOR = 4
+# Coalesce streamed deltas into at most ~30 placeholder renders per second
+STREAM_FLUSH_INTERVAL = 0.033
+
+def _close_chat_loop(loop, client):
+    """Close an ended session's client connections and event loop"""
+    try:
+        if client is not None:
+            loop.run_until_complete(client.close())
+    except RuntimeError:
+        # Collected on a thread already running another session's loop; the sockets close with the client
+        pass
+    finally:
+        loop.close()
+
+
 class CareerBuddyChat:
     def __init__(self):
         self.client = None
+        # Dedicated event loop so the async client's pooled connections survive across reruns
+        self._loop = asyncio.new_event_loop()
         self._initialize_client()
+        # Closed once the session's state (and with it this object) is discarded, so ended
+        # sessions don't leak the loop's and connections' file descriptors
+        weakref.finalize(self, _close_chat_loop, self._loop, self.client)
     
     def _initialize_client(self):
         """Initialize Azure OpenAI client"""
         try:
+            import openai
+            
             # Get configuration from environment variables
             azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
             api_key = os.getenv("AZURE_OPENAI_API_KEY")
@@ -57,8 +96,8 @@ class CareerBuddyChat:
                 st.error("Please set AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_API_KEY in your environment variables")
                 return False
             
-            # Create Azure OpenAI client
-            self.client = openai.AzureOpenAI(
+            # Create async Azure OpenAI client
+            self.client = openai.AsyncAzureOpenAI(
                 azure_endpoint=azure_endpoint,
                 api_key=api_key,
                 api_version=api_version
@@ -70,18 +109,39 @@ class CareerBuddyChat:
             st.error(f"Failed to initialize Azure OpenAI client: {str(e)}")
             return False
     
-    def get_response(self, messages: List[Dict], model_name: str = "gpt-4") -> str:
+    def _extra_body(self, cache_prompt: bool) -> Optional[Dict]:
+        """Request body additions: the prompt cache key, when configured and wanted"""
+        if cache_prompt and PROMPT_CACHE_KEY:
+            return {"prompt_cache_key": PROMPT_CACHE_KEY}
+        return None
+    
+    def _limits(self, model_name: str, max_tokens: int, stop: Optional[List[str]]) -> tuple:
+        """The max_tokens and stop to send for a deployment, allowing for reasoning models"""
+        if model_name.lower().startswith(REASONING_MODEL_PREFIXES):
+            return max_tokens * REASONING_MAX_TOKENS_FACTOR, None
+        return max_tokens, stop
+    
+    def run(self, coro):
+        """Run a coroutine to completion on this chat's event loop"""
+        return self._loop.run_until_complete(coro)
+    
+    async def get_response(self, messages: List[Dict], model_name: str = "gpt-4",
+                           max_tokens: int = DEFAULT_MAX_TOKENS, stop: Optional[List[str]] = None,
+                           cache_prompt: bool = True) -> str:
         """Get response from Azure OpenAI"""
         if not self.client:
             return "Azure OpenAI client is not initialized. Please check your configuration."
         
+        max_tokens, stop = self._limits(model_name, max_tokens, stop)
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=model_name,
                 messages=messages,
                 temperature=0.7,
-                max_tokens=2000,
-                stream=False
+                max_tokens=max_tokens,
+                stop=stop,
+                stream=False,
+                extra_body=self._extra_body(cache_prompt)
             )
             
             if response.choices and len(response.choices) > 0:
@@ -92,28 +152,37 @@ class CareerBuddyChat:
         except Exception as e:
             return f"Error getting response: {str(e)}"
     
-    def get_streaming_response(self, messages: List[Dict], model_name: str = "gpt-4"):
+    async def get_streaming_response(self, messages: List[Dict], model_name: str = "gpt-4",
+                                     max_tokens: int = DEFAULT_MAX_TOKENS, stop: Optional[List[str]] = None,
+                                     cache_prompt: bool = True):
         """Get streaming response from Azure OpenAI"""
         if not self.client:
             yield "Azure OpenAI client is not initialized. Please check your configuration."
             return
         
+        max_tokens, stop = self._limits(model_name, max_tokens, stop)
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=model_name,
                 messages=messages,
                 temperature=0.7,
-                max_tokens=2000,
-                stream=True
+                max_tokens=max_tokens,
+                stop=stop,
+                stream=True,
+                extra_body=self._extra_body(cache_prompt)
             )
             
             has_content = False
-            for chunk in response:
-                if chunk.choices and len(chunk.choices) > 0:
-                    delta_content = chunk.choices[0].delta.content
-                    if delta_content is not None:
-                        has_content = True
-                        yield delta_content
+            try:
+                async for chunk in response:
+                    if chunk.choices and len(chunk.choices) > 0:
+                        delta_content = chunk.choices[0].delta.content
+                        if delta_content is not None:
+                            has_content = True
+                            yield delta_content
+            finally:
+                # Release the HTTP connection even when the consumer stops early (e.g. a rerun)
+                await response.close()
             
             if not has_content:
                 yield "No response generated. Please try again with a different question."
@@ -122,34 +191,164 @@ class CareerBuddyChat:
             yield f"Error getting response: {str(e)}. Please check your model deployment name and try again."
 
 
+# Worst-case guard for pathological pages in the pdfplumber fallback
+PDF_PAGE_TIMEOUT_SECONDS = 5
+
+
+def _nonempty_lines(lines) -> List[str]:
+    """Strip each line and drop the empty ones, using C-level map/filter instead of a Python loop"""
+    return list(filter(None, map(str.strip, lines)))
+
+
+def _decode_line(line: bytes) -> str:
+    """Decode one line of an uploaded text file, falling back to cp1252 for non-UTF-8 resumes"""
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError:
+        return line.decode("cp1252", errors="replace")
+
+
+def _page_lines(page) -> List[str]:
+    """Return the non-empty, stripped text lines of a PyMuPDF page"""
+    return _nonempty_lines(page.get_text("text").splitlines())
+
+
+@st.cache_data(show_spinner=False)
+def extract_text_content_cached(file_bytes: bytes, ext: str) -> List[str]:
+    """
+    Extract text content line by line from DOCX, PDF, or TXT bytes.
+    Cached on the file content so Streamlit reruns don't reparse the same upload.
+    """
+    # Document parsers are imported lazily so reruns without an upload don't pay for them
+    if ext == 'docx':
+        from docx import Document
+        
+        doc = Document(io.BytesIO(file_bytes))
+        return _nonempty_lines(p.text for p in doc.paragraphs)
+    elif ext == 'pdf':
+        import fitz
+        
+        # Pages are parsed in-process: PyMuPDF takes milliseconds per page, far less than
+        # starting worker processes and shipping each one a copy of the PDF
+        with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+            lines = [ln for page in doc for ln in _page_lines(page)]
+        if lines:
+            return lines
+
+        # Fall back to pdfplumber when PyMuPDF finds no text layer (e.g. scanned PDFs)
+        import pdfplumber
+        
+        # No laparams: pdfplumber then skips pdfminer's layout analysis (incl. vertical text detection)
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+                for page_number, page in enumerate(pdf.pages, start=1):
+                    try:
+                        text = executor.submit(page.extract_text).result(timeout=PDF_PAGE_TIMEOUT_SECONDS) or ""
+                    except FutureTimeoutError:
+                        # The stuck worker can't be killed and is still reading the shared document,
+                        # which pdfminer doesn't allow from two threads; keep the pages parsed so far
+                        lines.append(f"[page {page_number}: extraction timed out, remaining pages skipped]")
+                        break
+                    lines.extend(_nonempty_lines(text.splitlines()))
+        finally:
+            executor.shutdown(wait=False)
+        return lines
+    elif ext == 'txt':
+        if file_bytes.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            # UTF-16 can't be split on raw newline bytes, decode it whole
+            return _nonempty_lines(file_bytes.decode("utf-16", errors="ignore").splitlines())
+        if file_bytes.startswith(codecs.BOM_UTF8):
+            file_bytes = file_bytes[len(codecs.BOM_UTF8):]
+        # Split the bytes first and decode line by line to avoid holding a second full copy
+        return _nonempty_lines(map(_decode_line, file_bytes.splitlines()))
+
+    else:
+        return [f"Unsupported file type: {ext}. Please upload .docx, .pdf, or .txt."]
+
+
 def extract_text_content(uploaded_file) -> List[str]:
     """
-    Extract text content line by line from DOCX, PDF, or TXT.
+    Extract text content line by line from an uploaded DOCX, PDF, or TXT file.
     Returns a list of strings (each line).
     """
     try:
         file_name = uploaded_file.name
         ext = file_name.lower().split('.')[-1]
+        return extract_text_content_cached(uploaded_file.getvalue(), ext)
+    except Exception as e:
+        return [f"Error reading file {file_name} ({ext}): {str(e)}"]
 
-        if ext == 'docx':
-            doc = Document(io.BytesIO(uploaded_file.read()))
-            return [p.text.strip() for p in doc.paragraphs if p.text.strip()]
-        elif ext == 'pdf':
-            lines = []
-            with pdfplumber.open(io.BytesIO(uploaded_file.read())) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text() or ""
-                    page_lines = [line.strip() for line in text.splitlines() if line.strip()]
-                    lines.extend(page_lines)
-            return lines
-        elif ext == 'txt':
-            content = uploaded_file.read().decode("utf-8", errors="ignore")
-            return [line.strip() for line in content.splitlines() if line.strip()]
+# Number of parsed resume lines shown in the sidebar preview
+RESUME_PREVIEW_LINES = 100
+
+# Chat history selection: always keep the most recent messages, plus older turns relevant to the new input
+CONTEXT_RECENT_MESSAGES = 6
+CONTEXT_RELEVANCE_THRESHOLD = 0.2
+CONTEXT_MAX_RELEVANT_TURNS = 3
+_WORD_RE = re.compile(r"[a-z0-9']{3,}")
+# Function words and chat filler that would otherwise make every question look related
+_STOP_WORDS = frozenset("""
+about above after again against all also and any are aren't because been before being below between both
+but can can't could couldn't did didn't does doesn't doing don't down during each few for from further get
+give had hadn't has hasn't have haven't having help her here hers herself him himself his how i'd i'll i'm
+i've into isn't it's its itself just know let's like make more most much must mustn't myself need not now
+off once only other ought our ours ourselves out over own please same she should shouldn't some such tell
+than that that's the their theirs them themselves then there there's these they they'd they'll they're
+they've this those through too under until very want was wasn't we'd we'll we're we've were weren't what
+what's when when's where where's which while who who's whom why why's will with won't would wouldn't you
+you'd you'll you're you've your yours yourself yourselves
+""".split())
+
+
+def _tokenize(text: str) -> set:
+    """Lowercased content-word set used for cheap relevance scoring"""
+    return set(_WORD_RE.findall(text.lower())) - _STOP_WORDS
 
+
+def _select_context(messages: List[Dict], user_msg: str, k: int = CONTEXT_RECENT_MESSAGES) -> List[Dict]:
+    """
+    Select the chat turns to send to the model.
+    Keeps the last k messages plus up to CONTEXT_MAX_RELEVANT_TURNS earlier user/assistant
+    pairs whose question has a Jaccard similarity to user_msg above CONTEXT_RELEVANCE_THRESHOLD.
+    Repeated questions (e.g. the same resume pasted twice) are only sent once.
+    """
+    chat = [m for m in messages if m["role"] in ("user", "assistant")]
+    # Start the recent window on a user message so it doesn't open with half a pair
+    split = max(len(chat) - k, 0)
+    while split > 0 and chat[split]["role"] == "assistant":
+        split -= 1
+    earlier, recent = chat[:split], chat[split:]
+
+    # Group the earlier history into turns: a user message followed by the assistant's replies
+    turns = []
+    for msg in earlier:
+        if msg["role"] == "user" or not turns:
+            turns.append([msg])
         else:
-            return [f"Unsupported file type: {ext}. Please upload .docx, .pdf, or .txt."]
-    except Exception as e:
-        return [f"Error reading file {file_name} ({ext}): {str(e)}"]
+            turns[-1].append(msg)
+
+    query_tokens = _tokenize(user_msg)
+    seen = {m["content"] for m in recent if m["role"] == "user"}
+
+    scored = []
+    for index, turn in enumerate(turns):
+        question = turn[0]
+        if question["role"] != "user" or question["content"] in seen or not query_tokens:
+            continue
+        tokens = _tokenize(question["content"])
+        if not tokens:
+            continue
+        similarity = len(query_tokens & tokens) / len(query_tokens | tokens)
+        if similarity > CONTEXT_RELEVANCE_THRESHOLD:
+            seen.add(question["content"])
+            scored.append((similarity, index))
+
+    # Most similar turns first (newest on ties), then back in chronological order
+    best = sorted(sorted(scored, reverse=True)[:CONTEXT_MAX_RELEVANT_TURNS], key=lambda item: item[1])
+    selected = [m for _, index in best for m in turns[index]]
+
+    return [{"role": m["role"], "content": m["content"]} for m in selected + recent]
 
 def initialize_session_state():
     """Initialize Streamlit session state"""
@@ -158,64 +357,113 @@ def initialize_session_state():
             {
                 "role": "assistant",
                 "content": "Hello! I'm Career Buddy, your AI career advisor. I'm here to help with resume analysis, career guidance, job search strategies, and more. How can I assist you today?",
-                "timestamp": datetime.now()
+                "timestamp": time.time()
             }
         ]
     
     if "career_buddy" not in st.session_state:
         st.session_state.career_buddy = CareerBuddyChat()
     
-    if "uploaded_content" not in st.session_state:
-        st.session_state.uploaded_content = None
+    if "resume_context" not in st.session_state:
+        st.session_state.resume_context = None
+
+USER_MESSAGE_TEMPLATE = """
+<div style="
+    display: flex;
+    justify-content: flex-end;
+    margin: 1rem 0;
+">
+    <div style="
+        background-color: #007ACC;
+        color: white;
+        padding: 0.75rem 1rem;
+        border-radius: 1rem 1rem 0.25rem 1rem;
+        max-width: 70%;
+        word-wrap: break-word;
+    ">
+        {content}
+    </div>
+</div>
+"""
+
+ASSISTANT_MESSAGE_TEMPLATE = """
+<div style="
+    display: flex;
+    justify-content: flex-start;
+    margin: 1rem 0;
+">
+    <div style="
+        background-color: #f1f3f4;
+        color: #333;
+        padding: 0.75rem 1rem;
+        border-radius: 1rem 1rem 1rem 0.25rem;
+        max-width: 70%;
+        word-wrap: break-word;
+        border-left: 3px solid #007ACC;
+    ">
+        {content}
+    </div>
+</div>
+"""
+
+def chat_message_html(content: str, is_user: bool = False) -> str:
+    """Build the styled HTML bubble for a chat message"""
+    template = USER_MESSAGE_TEMPLATE if is_user else ASSISTANT_MESSAGE_TEMPLATE
+    return template.format(content=content)
 
 def display_chat_message(message, is_user=False):
     """Display a chat message with proper styling"""
-    if is_user:
-        
-        st.markdown(
-            f"""
-            <div style="
-                display: flex;
-                justify-content: flex-end;
-                margin: 1rem 0;
-            ">
-                <div style="
-                    background-color: #007ACC;
-                    color: white;
-                    padding: 0.75rem 1rem;
-                    border-radius: 1rem 1rem 0.25rem 1rem;
-                    max-width: 70%;
-                    word-wrap: break-word;
-                ">
-                    {message['content']}
-                </div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-    else:
-        st.markdown(
-            f"""
-            <div style="
-                display: flex;
-                justify-content: flex-start;
-                margin: 1rem 0;
-            ">
-                <div style="
-                    background-color: #f1f3f4;
-                    color: #333;
-                    padding: 0.75rem 1rem;
-                    border-radius: 1rem 1rem 1rem 0.25rem;
-                    max-width: 70%;
-                    word-wrap: break-word;
-                    border-left: 3px solid #007ACC;
-                ">
-                    {message['content']}
-                </div>
-            </div>
-            """,
-            unsafe_allow_html=True
+    st.markdown(chat_message_html(message['content'], is_user), unsafe_allow_html=True)
+
+def stream_assistant_response(model_name: str):
+    """Stream Career Buddy's reply to the latest user message and add it to the chat history"""
+    with st.spinner("Career Buddy is thinking..."):
+        # Prepare messages for API in a single expression (system prompt, pinned resume, selected history)
+        resume_context = st.session_state.resume_context
+        api_messages = (
+            [{"role": "system", "content": CAREER_BUDDY_SYSTEM_PROMPT}]
+            + ([{"role": "system", "content": f"User's resume:\n{resume_context}"}] if resume_context else [])
+            + _select_context(st.session_state.messages, st.session_state.messages[-1]["content"])
         )
+        
+        # Get response from Career Buddy
+        response_placeholder = st.empty()
+        career_buddy = st.session_state.career_buddy
+        # Per-request token budget recorded on the user message (quick prompts / resume analysis)
+        max_tokens = st.session_state.messages[-1].get("max_tokens", DEFAULT_MAX_TOKENS)
+        
+        async def consume_stream() -> str:
+            # Stream the response, updating only the placeholder's single text element.
+            # Each chunk is rendered one step late, so the final chunk is drawn exactly once, without the cursor.
+            full_response = ""
+            last_flush = time.perf_counter()
+            stream = career_buddy.get_streaming_response(
+                api_messages, model_name, max_tokens=max_tokens, stop=CHAT_STOP_SEQUENCES
+            )
+            try:
+                async for chunk in stream:
+                    now = time.perf_counter()
+                    if full_response and now - last_flush > STREAM_FLUSH_INTERVAL:
+                        response_placeholder.markdown(chat_message_html(full_response + "▋"), unsafe_allow_html=True)
+                        last_flush = now
+                    full_response += chunk
+            finally:
+                # A rerun interrupts the placeholder update mid-stream; close the generator and its
+                # connection now instead of leaving them to the garbage collector
+                await stream.aclose()
+            
+            # Leave the final message in place; no clear-and-redraw pass
+            response_placeholder.markdown(chat_message_html(full_response), unsafe_allow_html=True)
+            return full_response
+        
+        full_response = career_buddy.run(consume_stream())
+        
+        # Add the complete response to chat history
+        st.session_state.messages.append({
+            "role": "assistant",
+            "content": full_response,
+            "timestamp": time.time()
+        })
 
 def main():
     # Page configuration
@@ -255,16 +503,23 @@ def main():
         )
         
         if uploaded_file:
-            file_content = extract_text_content(uploaded_file)
-            st.session_state.uploaded_content = file_content
+            # Only parse when a different file is uploaded, not on every rerun
+            if st.session_state.get("last_file_id") != uploaded_file.file_id:
+                st.session_state.uploaded_lines = extract_text_content(uploaded_file)
+                st.session_state.resume_context = "\n".join(st.session_state.uploaded_lines)
+                st.session_state.last_file_id = uploaded_file.file_id
+            file_content = st.session_state.uploaded_lines
             st.success(f"✅ {uploaded_file.name} uploaded!")
-            st.write(file_content)
+            # One truncated text element instead of a DOM node per resume line
+            with st.expander("Preview"):
+                st.text("\n".join(file_content[:RESUME_PREVIEW_LINES]))
             if st.button("📋 Analyze Resume"):
-                # Add resume analysis to chat with the actual content
+                # Resume content is sent once as a pinned system message, not in the chat turn
                 st.session_state.messages.append({
                     "role": "user",
-                    "content": f"📄 Please analyze my resume: {uploaded_file.name}\n\nResume Content:\n{file_content}",
-                    "timestamp": datetime.now()
+                    "content": f"📄 Please analyze my resume: {uploaded_file.name}",
+                    "max_tokens": RESUME_ANALYSIS_MAX_TOKENS,
+                    "timestamp": time.time()
                 })
                 # Trigger rerun to show the new message and get response
                 st.rerun()
@@ -278,11 +533,12 @@ def main():
         )
         
         if resume_text and st.button("📋 Analyze Text"):
-            st.session_state.uploaded_content = resume_text
+            st.session_state.resume_context = resume_text
             st.session_state.messages.append({
                 "role": "user",
-                "content": f"📄 Please analyze my resume (pasted text)\n\nResume Content:\n{resume_text}",
-                "timestamp": datetime.now()
+                "content": "📄 Please analyze my resume (pasted text)",
+                "max_tokens": RESUME_ANALYSIS_MAX_TOKENS,
+                "timestamp": time.time()
             })
             st.rerun()
         
@@ -335,7 +591,9 @@ def main():
                     {"role": "user", "content": "Say 'Hello, connection test successful!'"}
                 ]
                 
-                response = st.session_state.career_buddy.get_response(test_messages, model_name)
+                career_buddy = st.session_state.career_buddy
+                response = career_buddy.run(career_buddy.get_response(test_messages, model_name, max_tokens=50,
+                                                                      cache_prompt=False))
                 
                 if "Error" in response:
                     st.error(f"❌ Connection failed: {response}")
@@ -353,10 +611,12 @@ def main():
                 {
                     "role": "assistant",
                     "content": "Hello! I'm Career Buddy, your AI career advisor. How can I assist you today?",
-                    "timestamp": datetime.now()
+                    "timestamp": time.time()
                 }
             ]
-            st.session_state.uploaded_content = None
+            st.session_state.resume_context = None
+            # Let a still-attached upload be picked up again on the next run
+            st.session_state.pop("last_file_id", None)
             st.rerun()
     
     # Main chat interface    
@@ -373,17 +633,13 @@ def main():
     
     for prompt in quick_prompts:
         if st.button(prompt, key=f"quick_{prompt}", use_container_width=True):
-            # Include uploaded content if it exists and the prompt is relevant
-            content = prompt
-            if st.session_state.uploaded_content and any(word in prompt.lower() for word in ['skills', 'resume', 'career']):
-                content = f"{prompt}\n\nHere's my resume for context:\n{st.session_state.uploaded_content}"
-            
             st.session_state.messages.append({
                 "role": "user",
-                "content": content,
-                "timestamp": datetime.now()
+                "content": prompt,
+                "max_tokens": QUICK_PROMPT_MAX_TOKENS,
+                "timestamp": time.time()
             })
-            st.rerun()
+            # No rerun: the chat below renders the new message and streams the reply in this pass
     
     # Create chat container
     chat_container = st.container()
@@ -395,52 +651,15 @@ def main():
     
     # Handle new assistant response if last message is from user
     if st.session_state.messages and st.session_state.messages[-1]["role"] == "user":
-        with st.spinner("Career Buddy is thinking..."):
-            # Prepare messages for API
-            api_messages = [{"role": "system", "content": CAREER_BUDDY_SYSTEM_PROMPT}]
-            
-            for msg in st.session_state.messages:
-                if msg["role"] in ["user", "assistant"]:
-                    api_messages.append({
-                        "role": msg["role"],
-                        "content": msg["content"]
-                    })
-            
-            # Get response from Career Buddy
-            response_placeholder = st.empty()
-            full_response = ""
-            
-            # Stream the response
-            for chunk in st.session_state.career_buddy.get_streaming_response(api_messages, model_name):
-                full_response += chunk
-                with response_placeholder.container():
-                    display_chat_message({
-                        "role": "assistant",
-                        "content": full_response + "▋",
-                        "timestamp": datetime.now()
-                    })
-            
-            # Add the complete response to chat history
-            st.session_state.messages.append({
-                "role": "assistant",
-                "content": full_response,
-                "timestamp": datetime.now()
-            })
-            
-            # Clear the placeholder and show final message
-            response_placeholder.empty()
-            display_chat_message({
-                "role": "assistant",
-                "content": full_response,
-                "timestamp": datetime.now()
-            })
+        with chat_container:
+            stream_assistant_response(model_name)
     
     # Chat input
     st.markdown("---")
     
     # Show if resume content is loaded
-    if st.session_state.uploaded_content:
-        st.info(f"📄 Resume content loaded ({len(st.session_state.uploaded_content)} characters) - Will be included in relevant questions")
+    if st.session_state.resume_context:
+        st.info(f"📄 Resume content loaded ({len(st.session_state.resume_context)} characters) - Included as context for every question")
     
     # Create columns for chat input
     col1, col2 = st.columns([4, 1])
@@ -452,32 +671,24 @@ def main():
             placeholder="Ask me about your career, resume, job search, or anything else...",
             label_visibility="collapsed"
         )
-        
-        # Option to attach resume to current message
-        if st.session_state.uploaded_content:
-            attach_resume = st.checkbox("📎 Include my resume with this message", key="attach_resume")
-        else:
-            attach_resume = False
     
     with col2:
         send_button = st.button("Send 💬", type="primary", use_container_width=True)
     
     # Handle sending message
     if send_button and user_input:
-        # Prepare message content
-        message_content = user_input
-        if attach_resume and st.session_state.uploaded_content:
-            message_content = f"{user_input}\n\nHere's my resume for context:\n{st.session_state.uploaded_content}"
-        
         # Add user message to chat
-        st.session_state.messages.append({
+        message = {
             "role": "user",
-            "content": message_content,
-            "timestamp": datetime.now()
-        })
+            "content": user_input,
+            "timestamp": time.time()
+        }
+        st.session_state.messages.append(message)
         
-        # Clear input and rerun to get response
-        st.rerun()
+        # Render the message and stream the reply in place instead of rerunning the whole script
+        with chat_container:
+            display_chat_message(message, is_user=True)
+            stream_assistant_response(model_name)
     
     # Handle Enter key press
     if user_input and user_input != st.session_state.get("last_input", ""):
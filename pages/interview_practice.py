@@ -1,32 +1,94 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import openai
 import os
+import re
 from dotenv import load_dotenv
-from typing import Optional, List, Dict
-from datetime import datetime
-import asyncio
-import json
+from typing import Optional, List, Dict, Callable
 import time
 import uuid
-import requests
+import httpx
 import logging
+import threading
+import queue
+import pickle
+import random
+import hashlib
+import html
+import string
+import importlib.util
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 
-# Azure Cognitive Services imports
+# The OpenAI and Azure Speech SDKs are heavy, so they are only imported by _load_sdks()
+# when the engine is built; the page itself just checks that the Speech SDK is installed
+openai = None
+speechsdk = None
 try:
-    import azure.cognitiveservices.speech as speechsdk
-    from azure.cognitiveservices.speech import SpeechConfig, SpeechSynthesizer, AudioConfig
-    from azure.cognitiveservices.speech import SpeechRecognizer, ResultReason
-    SPEECH_SDK_AVAILABLE = True
+    SPEECH_SDK_AVAILABLE = importlib.util.find_spec("azure.cognitiveservices.speech") is not None
 except ImportError:
     SPEECH_SDK_AVAILABLE = False
 
+def _load_sdks():
+    """Import the OpenAI and Azure Speech SDKs on first use"""
+    global openai, speechsdk
+    if openai is None:
+        import openai as _openai
+        openai = _openai
+    if speechsdk is None and SPEECH_SDK_AVAILABLE:
+        import azure.cognitiveservices.speech as _speechsdk
+        speechsdk = _speechsdk
+
 # Load environment variables
 load_dotenv()
 
+# Azure Speech key, read once per script load; it gates speech, TTS and avatar features
+SPEECH_KEY = os.getenv("AZURE_SPEECH_KEY")
+
 # Azure Avatar Configuration
 SPEECH_ENDPOINT = os.getenv('SPEECH_ENDPOINT', 'https://eastus2.api.cognitive.microsoft.com')
 AVATAR_API_VERSION = '2024-04-15-preview'
+AVATAR_VOICE = 'en-US-AvaMultilingualNeural'
+
+# Text-to-Speech playback: the server's speaker plays audio as it is synthesized (default);
+# browser playback synthesizes each whole reply to MP3 first, so the user hears it later
+TTS_BROWSER_PLAYBACK = os.getenv('TTS_BROWSER_PLAYBACK', 'false').lower() == 'true'
+
+# Avatar job polling: exponential backoff unless Azure sends Retry-After
+AVATAR_POLL_INITIAL_DELAY = 1.0
+AVATAR_POLL_BACKOFF = 1.5
+AVATAR_POLL_MAX_DELAY = 5.0
+
+# start_avatar_job outcomes other than a job id
+AVATAR_JOB_CACHED = 'cached'
+AVATAR_JOB_FAILED = 'failed'
+
+# Opening question cache: once a job context has this many generated openers, new interviews draw
+# one at random instead of calling the model. Feedback turns are never cached; they carry a score.
+OPENING_QUESTION_POOL_SIZE = 5
+RESPONSE_CACHE_PATH = Path('.cache') / 'interview_opening_questions_v1.pkl'
+
+# Rendered avatar clips by text/character/style/voice, so repeated lines skip a fresh batch synthesis job
+AVATAR_VIDEO_CACHE_DIR = Path('.cache') / 'avatar'
+AVATAR_VIDEO_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+# Score the coach gives an answer, e.g. "Score: 8/10"
+_SCORE_RE = re.compile(r'score[:\s]*([0-9]+)', re.IGNORECASE)
+
+# Scores are kept in a fixed-size int8 array; no interview plausibly scores more answers than this
+MAX_SCORED_ANSWERS = 128
+
+# Speech input: recognition runs in the SDK's threads while the page polls for the transcript
+STT_LISTEN_TIMEOUT_SECONDS = 30
+STT_POLL_INTERVAL = 0.25
+
+# End of a sentence in streamed coach output
+_SENTENCE_END_RE = re.compile(r'([.!?])\s+')
+
+# Turns of conversation sent to the coach besides the system prompt and job context
+HISTORY_WINDOW_TURNS = 6
+
+logger = logging.getLogger(__name__)
 
 # Interview Practice Configuration
 INTERVIEW_COACH_SYSTEM_PROMPT = """
@@ -62,29 +124,102 @@ Keep the interview realistic and professional, matching the tone and expectation
 **Important: Your response will be read by Speech services so don't return a lot of symbols like !, ?, etc.**
 """
 
+def _hk(*parts: str) -> str:
+    """Hash key for the page's caches: a 128-bit blake2b digest of the separated parts"""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode())
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+def _avatar_skip_key(job_id: str) -> str:
+    """Widget key of the skip-to-audio button shown while an avatar job renders"""
+    return f"skip_avatar_{job_id}"
+
+# Fingerprint of the coach prompt, part of every opening question cache key so a prompt edit invalidates it
+_SYSTEM_PROMPT_SHA = _hk(INTERVIEW_COACH_SYSTEM_PROMPT)
+
+# Sidebar and response options, built once instead of on every rerun
+JOB_ROLES = (
+    "Software Engineer",
+    "Data Scientist",
+    "Product Manager",
+    "Marketing Manager",
+    "Sales Representative",
+    "Business Analyst",
+    "UX Designer",
+    "Project Manager",
+    "Customer Success Manager",
+    "Other"
+)
+EXPERIENCE_LEVELS = ("Entry Level", "Mid Level", "Senior Level", "Executive Level")
+COMPANY_TYPES = (
+    "Tech Startup",
+    "Large Tech Company",
+    "Fortune 500",
+    "Small Business",
+    "Non-Profit",
+    "Government",
+    "Consulting",
+    "Healthcare",
+    "Financial Services"
+)
+INTERVIEW_MODES = (
+    "Practice Mode (One question at a time)",
+    "Full Interview (30-45 minutes)",
+    "Quick Prep (5-10 questions)"
+)
+MODEL_OPTIONS = ("gpt-4", "gpt-4-turbo", "gpt-35-turbo", "gpt-4o")
+AVATAR_CHARACTERS = ("lisa", "jason", "clara", "sarah", "nancy")
+AVATAR_STYLES = ("casual-sitting", "business-standing", "professional-sitting")
+RESPONSE_METHODS_WITH_SPEECH = ("Type Response", "Speak Response")
+RESPONSE_METHODS_TEXT_ONLY = ("Type Response",)
+
 class InterviewPracticeEngine:
     def __init__(self):
         self.openai_client = None
         self.speech_config = None
-        self.synthesizer = None
+        self._speech_region = None
+        self.mp3_synthesizer = None
         self.recognizer = None
         self.audio_config = None
-        self.tts_task = None
-        self.is_speaking = False
         
-        # Avatar configuration
-        self.avatar_enabled = False
-        self.avatar_character = "lisa"  # Default avatar
-        self.avatar_style = "casual-sitting"  # Default style
+        # The engine is shared by every session, so per-user speech and avatar state lives in
+        # st.session_state, including each session's own speaker synthesizer (session_synthesizer()).
+        # Each spoken line gets a waiter on its own result future that sets that session's tts_done event.
+        self._tts_waiters = ThreadPoolExecutor(max_workers=4)
+        # Recognition results as ("text", transcript) or ("error", details), filled by recognizer callbacks.
+        # The recognizer listens on the server's one microphone, so one session at a time owns it:
+        # _stt_owner is (session id, start time), guarded by _stt_lock together with the queue.
+        self._stt_queue = queue.Queue()
+        self._stt_lock = threading.Lock()
+        self._stt_owner: Optional[tuple] = None
+        
+        # Avatar REST client, set up once in _initialize_clients
+        self._avatar_headers = None
+        self._http = None
         
-        # Speech control
-        self.should_stop_speech = False
+        # Opening question cache: {"prompt_sha|job_role|experience_level|company_type": [opening questions]},
+        # shared by all sessions and only read or written under _cache_lock
+        self._response_cache: Dict[str, List[str]] = self._load_response_cache()
+        self._cache_lock = threading.Lock()
         
         self._initialize_clients()
     
     def _initialize_clients(self):
         """Initialize Azure OpenAI and Speech services clients"""
         try:
+            _load_sdks()
+            
+            # Avatar API headers are built once instead of on every submit/poll
+            if SPEECH_KEY:
+                self._avatar_headers = {
+                    'Ocp-Apim-Subscription-Key': SPEECH_KEY,
+                    'Content-Type': 'application/json'
+                }
+            # Persistent HTTP/2 client so the avatar submit and every status poll share one keep-alive connection
+            self._http = httpx.Client(http2=True, timeout=30, headers=self._avatar_headers)
+            
             # Initialize Azure OpenAI
             azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
             api_key = os.getenv("AZURE_OPENAI_API_KEY")
@@ -99,18 +234,17 @@ class InterviewPracticeEngine:
             
             # Initialize Azure Speech Services
             if SPEECH_SDK_AVAILABLE:
-                speech_key = os.getenv("AZURE_SPEECH_KEY")
                 speech_region = os.getenv("AZURE_SPEECH_REGION")
                 
-                if speech_key and speech_region:
-                    self.speech_config = speechsdk.SpeechConfig(
-                        subscription=speech_key, 
-                        region=speech_region
+                if SPEECH_KEY and speech_region:
+                    self._speech_region = speech_region
+                    self.speech_config = self._new_speech_config()
+                    # Speaker playback uses the SDK's default WAV output
+                    self.speech_config.set_speech_synthesis_output_format(
+                        speechsdk.SpeechSynthesisOutputFormat.Riff16Khz16BitMonoPcm
                     )
-                    
-                    # Configure speech synthesis
-                    self.speech_config.speech_synthesis_voice_name = "en-US-AriaNeural"
-                    self.synthesizer = speechsdk.SpeechSynthesizer(speech_config=self.speech_config)
+                    if TTS_BROWSER_PLAYBACK:
+                        self._build_mp3_synthesizer()
                     
                     # Configure speech recognition language
                     self.speech_config.speech_recognition_language = "en-US"
@@ -119,158 +253,461 @@ class InterviewPracticeEngine:
                     self.speech_config.set_property(speechsdk.PropertyId.SpeechServiceConnection_EndSilenceTimeoutMs, "5000")
                     self.speech_config.set_property(speechsdk.PropertyId.Speech_SegmentationSilenceTimeoutMs, "5000")
                     
-                    # Don't create persistent recognizer - create fresh one for each recognition
+                    # One recognizer for the engine, so each answer doesn't pay recognizer and connection setup
+                    self.recognizer = speechsdk.SpeechRecognizer(speech_config=self.speech_config)
+                    self._connect_recognizer_events(self.recognizer)
             
         except Exception as e:
             st.error(f"Error initializing services: {str(e)}")
     
-    def get_interview_response(self, messages: List[Dict], model_name: str = "gpt-4") -> str:
-        """Get response from interview coach"""
+    def _new_speech_config(self):
+        """A SpeechConfig for the configured Speech resource, with the interviewer's voice"""
+        config = speechsdk.SpeechConfig(subscription=SPEECH_KEY, region=self._speech_region)
+        config.speech_synthesis_voice_name = "en-US-AriaNeural"
+        return config
+    
+    def _build_mp3_synthesizer(self):
+        """Build the shared browser-playback synthesizer, which is then reused for every turn"""
+        # No audio device: each utterance comes back as one MP3 clip for the browser to play.
+        # Requests are independent futures, so sessions can share it; nothing here is ever stopped.
+        mp3_config = self._new_speech_config()
+        mp3_config.set_speech_synthesis_output_format(
+            speechsdk.SpeechSynthesisOutputFormat.Audio24Khz48KBitRateMonoMp3
+        )
+        self.mp3_synthesizer = speechsdk.SpeechSynthesizer(speech_config=mp3_config, audio_config=None)
+    
+    def session_synthesizer(self):
+        """
+        This session's speaker synthesizer (None in browser mode or without Speech), built on first use.
+        It is per session so one user's Stop doesn't cut off everyone's speech; its websocket is
+        opened up front so interviewer turns don't pay a fresh TLS + websocket handshake.
+        """
+        if TTS_BROWSER_PLAYBACK or not self.speech_config:
+            return None
+        if st.session_state.get("speech_synthesizer") is None:
+            try:
+                synthesizer = speechsdk.SpeechSynthesizer(speech_config=self.speech_config)
+                connection = speechsdk.Connection.from_speech_synthesizer(synthesizer)
+                connection.open(True)
+            except Exception as e:
+                st.error(f"Error initializing speech synthesis: {str(e)}")
+                return None
+            st.session_state.speech_synthesizer = synthesizer
+            st.session_state.speech_connection = connection
+        return st.session_state.speech_synthesizer
+    
+    def _recover_synthesizers(self, cancellation_details) -> bool:
+        """Rebuild the synthesizers when synthesis was canceled because authentication expired or failed"""
+        if cancellation_details.error_code != speechsdk.CancellationErrorCode.AuthenticationFailure:
+            return False
+        logger.info("Speech synthesis authentication failed, rebuilding synthesizers")
+        if TTS_BROWSER_PLAYBACK:
+            self._build_mp3_synthesizer()
+        # This session's speaker synthesizer is rebuilt on its next use
+        st.session_state.pop("speech_synthesizer", None)
+        st.session_state.pop("speech_connection", None)
+        return True
+    
+    def warm_up(self):
+        """
+        Open the OpenAI, Speech, and Avatar connections in the background once the engine is built,
+        so the first interview turn doesn't pay for the TLS and auth handshakes
+        """
+        tasks = []
+        if self.openai_client:
+            # Listing models authenticates and opens the connection without generating (billed) tokens,
+            # and doesn't depend on which deployment the user picks
+            tasks.append(lambda: self.openai_client.models.list())
+        # Speaker synthesizers are per session and open their own connection when they are built
+        synthesizer = self.mp3_synthesizer
+        if synthesizer:
+            tasks.append(lambda: synthesizer.speak_ssml_async(
+                '<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="en-US">'
+                '<voice name="en-US-AriaNeural"> </voice></speak>'
+            ).get())
+        if self._avatar_headers:
+            tasks.append(lambda: self._http.head(
+                f"{SPEECH_ENDPOINT}/avatar/batchsyntheses?api-version={AVATAR_API_VERSION}",
+                timeout=5
+            ))
+        
+        def run_quietly(task):
+            try:
+                task()
+            except Exception as e:
+                logger.info("Warm-up request failed: %s", e)
+        
+        # Fire and forget: the page keeps rendering while the connections are set up
+        executor = ThreadPoolExecutor(max_workers=3)
+        for task in tasks:
+            executor.submit(run_quietly, task)
+        executor.shutdown(wait=False)
+    
+    def _connect_recognizer_events(self, recognizer):
+        """Push each recognized answer (or recognition error) onto the STT queue"""
+        def on_recognized(evt):
+            if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+                self._stt_queue.put(("text", evt.result.text))
+            else:
+                self._stt_queue.put(("text", ""))
+        
+        def on_canceled(evt):
+            if evt.cancellation_details.reason == speechsdk.CancellationReason.Error:
+                self._stt_queue.put(("error", evt.cancellation_details.error_details))
+            else:
+                self._stt_queue.put(("text", ""))
+        
+        recognizer.recognized.connect(on_recognized)
+        recognizer.canceled.connect(on_canceled)
+    
+    def _load_response_cache(self) -> Dict[str, List[str]]:
+        """Load the persisted opening question cache, if any"""
+        try:
+            with open(RESPONSE_CACHE_PATH, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return {}
+    
+    def _save_response_cache(self):
+        """Persist the opening question cache so it carries over between sessions (call with _cache_lock held)"""
+        try:
+            RESPONSE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(RESPONSE_CACHE_PATH, 'wb') as f:
+                pickle.dump(self._response_cache, f)
+        except (OSError, pickle.PicklingError) as e:
+            logger.warning("Could not save interview response cache: %s", e)
+    
+    def _add_cached_response(self, cache_key: str, response: str):
+        """Add a generated opening question to the pool for a job context and persist the cache"""
+        with self._cache_lock:
+            pool = self._response_cache.setdefault(cache_key, [])
+            if response not in pool:
+                pool.append(response)
+                self._save_response_cache()
+    
+    def _prune_history(self, messages: List[Dict], k: int = HISTORY_WINDOW_TURNS) -> List[Dict]:
+        """Keep the system prompt, the job context, and the last k question/answer turns"""
+        if len(messages) <= 2 + k * 2:
+            return messages
+        return messages[:2] + messages[-k * 2:]
+    
+    def stream_interview_response(self, messages: List[Dict], model_name: str = "gpt-4",
+                                  cache_key: Optional[str] = None):
+        """
+        Stream the interview coach's response, yielding it one sentence at a time.
+        cache_key (the job context) is only given for the opening question: once that context has
+        a full pool of generated openers, one of them is returned instead of calling the model.
+        """
         if not self.openai_client:
-            return "Interview coach is not available. Please check your Azure OpenAI configuration."
+            yield "Interview coach is not available. Please check your Azure OpenAI configuration."
+            return
+        
+        if cache_key:
+            cache_key = f"{_SYSTEM_PROMPT_SHA}|{cache_key}"
+            with self._cache_lock:
+                pool = self._response_cache.get(cache_key, [])
+                cached = random.choice(pool) if len(pool) >= OPENING_QUESTION_POOL_SIZE else None
+            if cached:
+                # Drawing from several openers keeps repeat interviews from always starting the same way
+                yield cached
+                return
         
         try:
             response = self.openai_client.chat.completions.create(
                 model=model_name,
-                messages=messages,
+                messages=self._prune_history(messages),
                 temperature=0.5,  # Slightly higher for more varied questions
-                max_tokens=500
+                max_tokens=500,
+                stream=True
             )
             
-            if response.choices and len(response.choices) > 0:
-                return response.choices[0].message.content or "No response generated."
-            else:
-                return "No response received. Please try again."
+            content = ""
+            buffer = ""
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                content += delta
+                buffer += delta
+                # Hand finished sentences on right away so TTS can start before generation ends
+                sentence_end = None
+                for sentence_end in _SENTENCE_END_RE.finditer(buffer):
+                    pass
+                if sentence_end:
+                    yield buffer[:sentence_end.end()]
+                    buffer = buffer[sentence_end.end():]
+            if buffer:
+                yield buffer
+            
+            if not content:
+                yield "No response generated."
+                return
+            if cache_key:
+                self._add_cached_response(cache_key, content)
                 
         except Exception as e:
-            return f"Error getting interview response: {str(e)}"
+            yield f"Error getting interview response: {str(e)}"
     
-    def text_to_speech(self, text: str) -> bool:
-        """Convert text to speech using Azure TTS"""
-        if not self.synthesizer:
+    def speak_while_streaming(self, sentences) -> tuple:
+        """
+        Queue each sentence for synthesis as soon as it is generated.
+        Speaker playback starts with the first sentence, so speech overlaps the rest of the generation;
+        the queued requests are kept in st.session_state.tts_queued for stop_speech and
+        check_queued_speech. Browser playback gets no overlap: the joined MP3 audio is only returned
+        once generation has ended and the last sentence is synthesized, so it starts playing after
+        the whole reply is ready. Returns (full_text, audio_bytes_or_None).
+        """
+        text = ""
+        pending = []
+        speaker = self.session_synthesizer()
+        for sentence in sentences:
+            text += sentence
+            if not sentence.strip():
+                continue
+            if self.mp3_synthesizer:
+                # Synthesis runs while generation continues, but the clips can only be played together at the end
+                pending.append(self.mp3_synthesizer.speak_text_async(sentence))
+            elif speaker:
+                if not st.session_state.tts_queued:
+                    st.session_state.is_speaking = True
+                    st.session_state.should_stop_speech = False
+                st.session_state.tts_queued.append(speaker.speak_text_async(sentence))
+        
+        if not pending:
+            return text, None
+        
+        audio = b""
+        for task in pending:
+            result = task.get()
+            if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+                if result.reason == speechsdk.ResultReason.Canceled:
+                    self._recover_synthesizers(result.cancellation_details)
+                # Partial audio would skip sentences; the caller speaks the whole reply again instead
+                return text, None
+            audio += result.audio_data
+        return text, audio
+    
+    def check_queued_speech(self):
+        """
+        Keep is_speaking up to date for sentences queued by speak_while_streaming, and once they
+        have all finished, check their results, rebuilding the synthesizer after an auth failure
+        """
+        queued = st.session_state.tts_queued
+        if not queued:
+            return
+        if st.session_state.tts_queued_results is None:
+            # One waiter collects the queued lines' results in order, off the script thread
+            st.session_state.tts_queued_results = self._tts_waiters.submit(lambda: [task.get() for task in queued])
+        waiter = st.session_state.tts_queued_results
+        if not waiter.done():
+            st.session_state.is_speaking = True
+            return
+        
+        st.session_state.tts_queued = []
+        st.session_state.tts_queued_results = None
+        st.session_state.is_speaking = False
+        for result in waiter.result():
+            if result.reason == speechsdk.ResultReason.Canceled:
+                cancellation_details = result.cancellation_details
+                if not self._recover_synthesizers(cancellation_details):
+                    st.warning(f"Speech synthesis stopped: {cancellation_details.reason}")
+                break
+    
+    def play_audio(self, audio: bytes):
+        """Play pre-synthesized MP3 audio in the browser"""
+        st.audio(audio, format="audio/mpeg", autoplay=True)
+    
+    def synthesize_mp3(self, text: str) -> Optional[bytes]:
+        """Synthesize the whole text to MP3 audio for browser playback (None if synthesis failed)"""
+        result = self.mp3_synthesizer.speak_text_async(text).get()
+        if (result.reason == speechsdk.ResultReason.Canceled and
+                self._recover_synthesizers(result.cancellation_details)):
+            result = self.mp3_synthesizer.speak_text_async(text).get()
+        if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+            st.warning("Speech synthesis could not be completed.")
+            return None
+        return result.audio_data
+    
+    def _speak_in_browser(self, text: str, on_start: Optional[Callable[[], None]] = None) -> bool:
+        """Synthesize the whole text to MP3, then play it in the user's browser"""
+        try:
+            st.session_state.is_speaking = True
+            st.session_state.should_stop_speech = False
+            
+            audio = self.synthesize_mp3(text)
+            if not audio:
+                return False
+            
+            if on_start:
+                on_start()
+            self.play_audio(audio)
+            return True
+        
+        except Exception as e:
+            st.error(f"Text-to-speech error: {str(e)}")
+            return False
+        finally:
+            st.session_state.is_speaking = False
+            st.session_state.should_stop_speech = False
+    
+    def text_to_speech(self, text: str, on_start: Optional[Callable[[], None]] = None) -> bool:
+        """Convert text to speech using Azure TTS, calling on_start once audio is under way"""
+        if self.mp3_synthesizer:
+            return self._speak_in_browser(text, on_start)
+        
+        synthesizer = self.session_synthesizer()
+        if not synthesizer:
             st.error("Azure Text-to-Speech not available. Please check your configuration.")
             return False
         
         try:
-            self.is_speaking = True
-            self.should_stop_speech = False
+            st.session_state.is_speaking = True
+            st.session_state.should_stop_speech = False
+            # A fresh event per line, so a waiter finishing late can't wake a later line early
+            tts_done = st.session_state.tts_done = threading.Event()
             
-            # Start synthesis asynchronously
-            self.tts_task = self.synthesizer.speak_text_async(text)
+            # Start synthesis asynchronously; a waiter on this request's result (or stop_speech) wakes us up
+            st.session_state.tts_task = synthesizer.speak_text_async(text)
+            waiter = self._tts_waiters.submit(st.session_state.tts_task.get)
+            waiter.add_done_callback(lambda _: tts_done.set())
+            if on_start:
+                on_start()
+            finished = tts_done.wait(timeout=30)  # 30 second timeout
             
-            # Poll for completion or stop signal
-            import threading
-            import time as time_module
+            if st.session_state.should_stop_speech:
+                # User requested stop - stop_speech already cancelled synthesis
+                return False
             
-            def check_completion():
+            if not finished:
+                # Timeout reached
                 try:
-                    result = self.tts_task.get()
-                    return result
+                    synthesizer.stop_speaking_async()
                 except:
-                    return None
-            
-            # Wait with interruption capability
-            start_time = time_module.time()
-            while time_module.time() - start_time < 30:  # 30 second timeout
-                if self.should_stop_speech:
-                    # User requested stop - cancel task
-                    try:
-                        self.synthesizer.stop_speaking_async()
-                    except:
-                        pass
-                    return False
-                
-                # Check if task is complete
-                if self.tts_task and hasattr(self.tts_task, 'get'):
-                    try:
-                        # Non-blocking check
-                        result = self.tts_task.get()
-                        if result:
-                            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                                return True
-                            elif result.reason == speechsdk.ResultReason.Canceled:
-                                cancellation_details = result.cancellation_details
-                                if cancellation_details.reason != speechsdk.CancellationReason.EndOfStream:
-                                    if not self.should_stop_speech:
-                                        st.warning(f"Speech synthesis stopped: {cancellation_details.reason}")
-                                return False
-                            else:
-                                return False
-                    except:
-                        # Task not ready yet, continue waiting
-                        pass
-                
-                # Brief pause
-                time_module.sleep(0.2)
+                    pass
+                return False
             
-            # Timeout reached
-            return False
+            # Synthesis has finished, so this does not block
+            result = waiter.result()
+            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+                return True
+            elif result.reason == speechsdk.ResultReason.Canceled:
+                cancellation_details = result.cancellation_details
+                # A fresh synthesizer is ready for the next turn if authentication had expired
+                self._recover_synthesizers(cancellation_details)
+                if cancellation_details.reason != speechsdk.CancellationReason.EndOfStream:
+                    st.warning(f"Speech synthesis stopped: {cancellation_details.reason}")
+                return False
+            else:
+                return False
                 
         except Exception as e:
-            if not self.should_stop_speech:
+            if not st.session_state.should_stop_speech:
                 st.error(f"Text-to-speech error: {str(e)}")
             return False
         finally:
-            self.is_speaking = False
-            self.tts_task = None
-            self.should_stop_speech = False
+            st.session_state.is_speaking = False
+            st.session_state.tts_task = None
+            st.session_state.should_stop_speech = False
     
     def stop_speech(self) -> bool:
         """Stop ongoing text-to-speech"""
         try:
-            if self.is_speaking or self.tts_task:
-                # Set stop flag to interrupt the polling loop
-                self.should_stop_speech = True
+            if st.session_state.is_speaking or st.session_state.tts_task or st.session_state.tts_queued:
+                # Set stop flag and wake up the waiting text_to_speech call
+                st.session_state.should_stop_speech = True
+                st.session_state.tts_done.set()
                 
-                # Try to stop the synthesizer directly
-                if self.synthesizer:
+                # Stop this session's synthesizer only, which also cancels every sentence queued by
+                # speak_while_streaming; it is kept, so its connection stays warm
+                synthesizer = st.session_state.get("speech_synthesizer")
+                if synthesizer:
                     try:
-                        # This is the correct method for Azure Speech SDK
-                        self.synthesizer.stop_speaking_async()
-                    except Exception as e:
-                        # If direct stop fails, try recreating the synthesizer
-                        try:
-                            if self.speech_config:
-                                # Close and recreate synthesizer to force stop
-                                old_synthesizer = self.synthesizer
-                                self.synthesizer = speechsdk.SpeechSynthesizer(speech_config=self.speech_config)
-                                try:
-                                    old_synthesizer.close()
-                                except:
-                                    pass
-                        except:
-                            pass
-                
-                # Clean up task
-                if self.tts_task:
-                    try:
-                        self.tts_task = None
+                        synthesizer.stop_speaking_async()
                     except:
                         pass
                 
-                # Reset state immediately
-                self.is_speaking = False
+                # Reset state immediately; text_to_speech never calls get() on a stopped task
+                st.session_state.tts_task = None
+                st.session_state.tts_queued = []
+                st.session_state.tts_queued_results = None
+                st.session_state.is_speaking = False
                 
                 return True
             return False
         except Exception as e:
             st.error(f"Error stopping speech: {str(e)}")
             # Force reset state even if there's an error
-            self.should_stop_speech = True
-            self.is_speaking = False
-            self.tts_task = None
+            st.session_state.should_stop_speech = True
+            st.session_state.is_speaking = False
+            st.session_state.tts_task = None
+            st.session_state.tts_queued = []
+            st.session_state.tts_queued_results = None
             return False
     
-    def text_to_speech_avatar(self, text: str, avatar_enabled: bool = True) -> bool:
+    def text_to_speech_avatar(self, text: str, avatar_enabled: bool = True, job_id: Optional[str] = None) -> bool:
         """Convert text to speech with avatar if enabled, fallback to audio-only"""
         if avatar_enabled and SPEECH_SDK_AVAILABLE:
-            return self._synthesize_with_avatar(text)
+            return self._synthesize_with_avatar(text, job_id)
         else:
             return self.text_to_speech(text)
     
-    def _synthesize_with_avatar(self, text: str) -> bool:
+    def _avatar_cache_path(self, text: str) -> Path:
+        """Disk location of the rendered video for a line of text with the session's avatar settings"""
+        key = _hk(text, st.session_state.avatar_character, st.session_state.avatar_style, AVATAR_VOICE)
+        return AVATAR_VIDEO_CACHE_DIR / f"{key}.mp4"
+    
+    def start_avatar_job(self, text: str) -> str:
+        """
+        Submit the avatar job as soon as the response text is known, so Azure starts rendering while
+        the message is added and drawn. Returns the job id, AVATAR_JOB_CACHED, or AVATAR_JOB_FAILED.
+        """
+        if self._avatar_cache_path(text).exists():
+            return AVATAR_JOB_CACHED
+        job_id = self._create_avatar_job_id()
+        return job_id if self._submit_avatar_synthesis(job_id, text) else AVATAR_JOB_FAILED
+    
+    def _cache_avatar_video(self, path: Path, video_url: str) -> bool:
+        """Download a rendered avatar video to the disk cache, evicting the least recently used clips"""
+        try:
+            AVATAR_VIDEO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            partial = path.with_suffix('.part')
+            with httpx.stream('GET', video_url, timeout=30) as response:
+                response.raise_for_status()
+                with open(partial, 'wb') as f:
+                    for chunk in response.iter_bytes():
+                        f.write(chunk)
+            partial.replace(path)
+        except (httpx.HTTPError, OSError) as e:
+            logger.warning("Could not cache avatar video: %s", e)
+            return False
+        
+        clips = sorted(AVATAR_VIDEO_CACHE_DIR.glob('*.mp4'), key=lambda clip: clip.stat().st_mtime, reverse=True)
+        total = 0
+        for clip in clips:
+            total += clip.stat().st_size
+            if total > AVATAR_VIDEO_CACHE_MAX_BYTES and clip != path:
+                clip.unlink(missing_ok=True)
+        return True
+    
+    def _synthesize_with_avatar(self, text: str, job_id: Optional[str] = None) -> bool:
         """Private method to handle Azure Avatar batch synthesis"""
         try:
+            # Identical lines with the same avatar replay the clip rendered earlier
+            cache_path = self._avatar_cache_path(text)
+            if job_id in (None, AVATAR_JOB_CACHED) and cache_path.exists():
+                cache_path.touch()  # mtime doubles as the LRU timestamp
+                st.video(str(cache_path))
+                st.success("✅ Avatar response generated successfully!")
+                return True
+            if job_id == AVATAR_JOB_FAILED:
+                # start_avatar_job already reported the failed submit; don't submit (and pay) again
+                return self.text_to_speech(text)
+            if job_id == AVATAR_JOB_CACHED:
+                # The clip was evicted since start_avatar_job found it
+                job_id = None
+            
             # Display avatar interface while processing
             avatar_placeholder = st.empty()
             with avatar_placeholder.container():
@@ -291,26 +728,24 @@ class InterviewPracticeEngine:
                 </div>
                 """, unsafe_allow_html=True)
             
-            # Submit avatar synthesis job
-            job_id = self._create_avatar_job_id()
-            success = self._submit_avatar_synthesis(job_id, text)
+            # Submit avatar synthesis job, unless start_avatar_job already did
+            if job_id:
+                success = True
+            else:
+                job_id = self._create_avatar_job_id()
+                success = self._submit_avatar_synthesis(job_id, text)
             
             if success:
                 # Monitor synthesis progress
                 video_url = self._monitor_avatar_synthesis(job_id)
                 
-                if video_url == "SKIP_TO_AUDIO":
-                    # User chose to skip to audio-only
-                    avatar_placeholder.empty()
-                    st.info("🔊 Continuing with audio-only as requested...")
-                elif video_url:
+                if video_url:
                     # Display the generated avatar video
                     avatar_placeholder.empty()
                     try:
-                        st.video(video_url)
+                        cached = self._cache_avatar_video(cache_path, video_url)
+                        st.video(str(cache_path) if cached else video_url)
                         st.success("✅ Avatar response generated successfully!")
-                        # Add a small delay to ensure video loads
-                        time.sleep(1)
                         return True
                     except Exception as e:
                         st.error(f"Failed to display video: {str(e)}")
@@ -334,30 +769,17 @@ class InterviewPracticeEngine:
         """Generate unique job ID for avatar synthesis"""
         return str(uuid.uuid4())
     
-    def _authenticate_avatar_api(self) -> dict:
-        """Authenticate with Azure Speech service for avatar synthesis"""
-        subscription_key = os.getenv("AZURE_SPEECH_KEY")
-        if subscription_key:
-            return {'Ocp-Apim-Subscription-Key': subscription_key}
-        else:
-            st.error("Azure Speech key not found. Please check your configuration.")
-            return {}
-    
     def _submit_avatar_synthesis(self, job_id: str, text: str) -> bool:
         """Submit avatar synthesis job to Azure"""
         url = f'{SPEECH_ENDPOINT}/avatar/batchsyntheses/{job_id}?api-version={AVATAR_API_VERSION}'
         
-        header = {
-            'Content-Type': 'application/json'
-        }
-        header.update(self._authenticate_avatar_api())
-        
-        if not header.get('Ocp-Apim-Subscription-Key'):
+        if not self._avatar_headers:
+            st.error("Azure Speech key not found. Please check your configuration.")
             return False
         
         payload = {
             'synthesisConfig': {
-                'voice': 'en-US-AvaMultilingualNeural',
+                'voice': AVATAR_VOICE,
             },
             'inputKind': 'plainText',
             'inputs': [
@@ -367,8 +789,8 @@ class InterviewPracticeEngine:
             ],
             'avatarConfig': {
                 'customized': False,
-                'talkingAvatarCharacter': self.avatar_character or 'Lisa',
-                'talkingAvatarStyle': self.avatar_style or 'casual-sitting',
+                'talkingAvatarCharacter': st.session_state.avatar_character or 'Lisa',
+                'talkingAvatarStyle': st.session_state.avatar_style or 'casual-sitting',
                 'videoFormat': 'mp4',
                 'videoCodec': 'h264',
                 'subtitleType': 'soft_embedded',
@@ -377,36 +799,47 @@ class InterviewPracticeEngine:
         }
         
         try:
-            response = requests.put(url, json.dumps(payload), headers=header, timeout=30)
+            response = self._http.put(url, json=payload)
             if response.status_code < 400:
                 st.success(f"✅ Avatar synthesis job submitted successfully (ID: {job_id[:8]}...)")
                 return True
             else:
                 st.error(f"❌ Failed to submit avatar synthesis: [{response.status_code}] {response.text[:200]}...")
                 return False
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             st.error(f"❌ Request failed: {str(e)}")
             return False
     
+    def _next_poll_delay(self, response, delay: float) -> float:
+        """Seconds to wait before the next status poll"""
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return delay
+    
     def _monitor_avatar_synthesis(self, job_id: str, timeout: int = 180) -> Optional[str]:
         """Monitor avatar synthesis job and return video URL when complete"""
         url = f'{SPEECH_ENDPOINT}/avatar/batchsyntheses/{job_id}?api-version={AVATAR_API_VERSION}'
-        header = self._authenticate_avatar_api()
-        
-        if not header.get('Ocp-Apim-Subscription-Key'):
+        if not self._avatar_headers:
             return None
         
         start_time = time.time()
+        delay = AVATAR_POLL_INITIAL_DELAY
         progress_bar = st.progress(0, text="🎭 Generating avatar video...")
         
         # Create placeholders for skip button
         skip_container = st.empty()
-        # Create unique button key using timestamp and job_id
-        button_key = f"skip_avatar_{job_id}_{int(start_time * 1000)}"
+        skip_rendered = False
+        # A click interrupts this run; the next run finds the job's button key set and speaks audio-only
+        # (see speak_latest_message), so the key must stay the same for the job across reruns
+        button_key = _avatar_skip_key(job_id)
         
         try:
             while time.time() - start_time < timeout:
-                response = requests.get(url, headers=header, timeout=10)
+                response = self._http.get(url, timeout=10)
                 
                 if response.status_code < 400:
                     job_data = response.json()
@@ -417,29 +850,25 @@ class InterviewPracticeEngine:
                     progress = min(elapsed / timeout, 0.95)
                     progress_bar.progress(progress, text=f"🎭 Status: {status}...")
                     
-                    # Show skip button after 15 seconds
-                    if elapsed > 15:
+                    # Show skip button once after 15 seconds
+                    if elapsed > 15 and not skip_rendered:
                         with skip_container.container():
                             st.markdown("---")
                             col1, col2, col3 = st.columns([1, 2, 1])
                             with col2:
-                                if st.button("⏭️ Skip to Audio-Only", 
-                                           type="secondary", 
-                                           use_container_width=True,
-                                           key=button_key,
-                                           help="Stop waiting for avatar and use regular text-to-speech instead"):
-                                    progress_bar.empty()
-                                    skip_container.empty()
-                                    st.info("🔊 Switching to audio-only mode...")
-                                    return "SKIP_TO_AUDIO"
+                                st.button("⏭️ Skip to Audio-Only", 
+                                          type="secondary", 
+                                          use_container_width=True,
+                                          key=button_key,
+                                          help="Stop waiting for avatar and use regular text-to-speech instead")
                             st.caption("🎭 Avatar generation can take 1-3 minutes. You can continue with audio-only if needed.")
+                        skip_rendered = True
                     
                     if status == 'Succeeded':
                         video_url = job_data.get('outputs', {}).get('result')
-                        progress_bar.progress(1.0, text="✅ Avatar video ready!")
                         skip_container.empty()
-                        time.sleep(1)  # Brief pause to show completion
                         progress_bar.empty()
+                        st.toast("✅ Avatar video ready!")
                         return video_url
                     elif status == 'Failed':
                         error_detail = job_data.get('error', {}).get('message', 'Unknown error')
@@ -448,8 +877,9 @@ class InterviewPracticeEngine:
                         skip_container.empty()
                         return None
                     
-                    # Wait before next check
-                    time.sleep(3)
+                    # Wait before next check, honoring Azure's Retry-After when present
+                    time.sleep(self._next_poll_delay(response, delay))
+                    delay = min(delay * AVATAR_POLL_BACKOFF, AVATAR_POLL_MAX_DELAY)
                 else:
                     st.error(f"❌ Failed to check synthesis status: {response.text[:200]}...")
                     progress_bar.empty()
@@ -462,68 +892,76 @@ class InterviewPracticeEngine:
             st.warning("⏰ Avatar synthesis timeout. This may take longer for complex requests.")
             return None
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             progress_bar.empty()
             skip_container.empty()
             st.error(f"❌ Monitoring failed: {str(e)}")
             return None
     
-    def speech_to_text(self) -> Optional[str]:
-        """Convert speech to text using Azure STT"""
-        if not self.speech_config:
+    def _owns_recognizer(self) -> bool:
+        """Whether this session is the one recording (call with _stt_lock held)"""
+        return bool(self._stt_owner) and self._stt_owner[0] == st.session_state.speech_session_id
+    
+    def start_listening(self) -> bool:
+        """Start continuous recognition in the background; poll_transcript() picks up the answer"""
+        if not self.recognizer:
             st.error("Azure Speech-to-Text not available. Please check your configuration.")
-            return None
+            return False
         
-        # Create a fresh recognizer for each recognition to avoid state issues
-        recognizer = None
-        try:
-            # Create new recognizer instance
-            recognizer = speechsdk.SpeechRecognizer(speech_config=self.speech_config)
-            
-            st.info("🎤 Listening... Speak now! Take your time to give a complete answer.")
-            
-            # Use recognize_once_async with timeout for better control
-            result = recognizer.recognize_once()
+        with self._stt_lock:
+            if self._stt_owner:
+                # Another session's recording is taken over only once it has outlived the listen timeout
+                if (not self._owns_recognizer() and
+                        time.time() - self._stt_owner[1] < STT_LISTEN_TIMEOUT_SECONDS):
+                    st.warning("🎤 The microphone is in use by another session. Please try again shortly.")
+                    return False
+                self.recognizer.stop_continuous_recognition_async().get()
+            self._stt_owner = (st.session_state.speech_session_id, time.time())
             
-            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                if result.text and result.text.strip():
-                    return result.text.strip()
-                else:
-                    st.warning("No speech was detected. Please try again.")
-                    return None
-            elif result.reason == speechsdk.ResultReason.NoMatch:
-                st.warning("No speech could be recognized. Please speak clearly and try again.")
-                return None
-            elif result.reason == speechsdk.ResultReason.Canceled:
-                cancellation_details = result.cancellation_details
-                if cancellation_details.reason == speechsdk.CancellationReason.Error:
-                    st.error(f"Speech recognition error: {cancellation_details.error_details}")
-                else:
-                    st.warning("Speech recognition was canceled.")
-                return None
-            else:
-                st.warning("Unexpected result from speech recognition.")
+            # Drop results left over from an earlier, cancelled recording
+            while not self._stt_queue.empty():
+                self._stt_queue.get_nowait()
+            self.recognizer.start_continuous_recognition_async().get()
+        return True
+    
+    def stop_listening(self):
+        """Stop the background recognition, if this session started it"""
+        with self._stt_lock:
+            if self.recognizer and self._owns_recognizer():
+                self.recognizer.stop_continuous_recognition_async().get()
+                self._stt_owner = None
+    
+    def poll_transcript(self) -> Optional[tuple]:
+        """Return ("text", transcript) or ("error", details) once recognition is done, else None"""
+        with self._stt_lock:
+            if not self._owns_recognizer():
+                return ("error", "the microphone was taken over by another session")
+            try:
+                return self._stt_queue.get_nowait()
+            except queue.Empty:
                 return None
-                
-        except Exception as e:
-            st.error(f"Speech-to-text error: {str(e)}")
-            return None
-        
-        finally:
-            # Clean up the recognizer
-            if recognizer:
-                try:
-                    recognizer = None
-                except:
-                    pass
+
+@st.cache_resource(show_spinner=False)
+def get_engine() -> InterviewPracticeEngine:
+    """Build the interview engine once per process and share it across sessions and reruns"""
+    engine = InterviewPracticeEngine()
+    # The shared connections only need warming once, not for every new session
+    engine.warm_up()
+    return engine
 
 def initialize_interview_session():
     """Initialize interview session state"""
     if "interview_messages" not in st.session_state:
         st.session_state.interview_messages = []
     
+    if "api_messages" not in st.session_state:
+        # Role/content-only mirror of interview_messages, ready to send to the coach
+        st.session_state.api_messages = []
+    
     if "interview_engine" not in st.session_state:
-        st.session_state.interview_engine = InterviewPracticeEngine()
+        st.session_state.interview_engine = get_engine()
+        # Open this session's speaker connection now rather than on the first question
+        st.session_state.interview_engine.session_synthesizer()
     
     if "interview_mode" not in st.session_state:
         st.session_state.interview_mode = "practice"
@@ -538,59 +976,85 @@ def initialize_interview_session():
         st.session_state.question_count = 0
     
     if "interview_scores" not in st.session_state:
-        st.session_state.interview_scores = []
+        # Scores fill interview_scores[:interview_score_count]
+        st.session_state.interview_scores = np.zeros(MAX_SCORED_ANSWERS, dtype=np.int8)
+        st.session_state.interview_score_count = 0
     
     if "is_speaking" not in st.session_state:
         st.session_state.is_speaking = False
+    
+    if "should_stop_speech" not in st.session_state:
+        st.session_state.should_stop_speech = False
+    
+    if "tts_task" not in st.session_state:
+        st.session_state.tts_task = None
+    
+    if "tts_queued" not in st.session_state:
+        # Sentences speak_while_streaming queued on the speaker, and the waiter collecting their results
+        st.session_state.tts_queued = []
+        st.session_state.tts_queued_results = None
+    
+    if "tts_done" not in st.session_state:
+        # Set when this session's current line finishes or is stopped; text_to_speech replaces it per line
+        st.session_state.tts_done = threading.Event()
+    
+    if "speech_session_id" not in st.session_state:
+        # Identifies this session as the owner of the shared recognizer while it records
+        st.session_state.speech_session_id = str(uuid.uuid4())
+    
+    if "avatar_enabled" not in st.session_state:
+        st.session_state.avatar_enabled = False
+        st.session_state.avatar_character = "lisa"  # Default avatar
+        st.session_state.avatar_style = "casual-sitting"  # Default style
+    
+    if "last_spoken_idx" not in st.session_state:
+        # Index in interview_messages of the last message that was spoken
+        st.session_state.last_spoken_idx = -1
+
+# Interview chat bubble styles, injected once per page run instead of inlined in every message
+INTERVIEW_MESSAGE_CSS = """
+<style>
+.cb-row { display: flex; margin: 1rem 0; }
+.cb-row.cb-user { justify-content: flex-end; }
+.cb-row.cb-bot { justify-content: flex-start; }
+.cb-bubble { color: white; padding: 0.75rem 1rem; max-width: 70%; word-wrap: break-word; }
+.cb-user .cb-bubble { background-color: #2E8B57; border-radius: 1rem 1rem 0.25rem 1rem; }
+.cb-bot .cb-bubble { background-color: #4A4A4A; border-radius: 1rem 1rem 1rem 0.25rem; border-left: 3px solid #FFA500; }
+</style>
+"""
+
+USER_MESSAGE_TEMPLATE = string.Template(
+    '<div class="cb-row cb-user"><div class="cb-bubble"><strong>🎯 You:</strong><br>${content}</div></div>'
+)
+
+INTERVIEWER_MESSAGE_TEMPLATE = string.Template(
+    '<div class="cb-row cb-bot"><div class="cb-bubble"><strong>👨‍💼 Interviewer:</strong><br>${content}</div></div>'
+)
+
+def bubble_content(text: str) -> str:
+    """
+    Escape message text for a chat bubble. Newlines become <br>: a blank line would end the
+    HTML block in markdown and spill the rest of the joined history out of its bubble.
+    """
+    return html.escape(text).replace("\n", "<br>")
+
+def interview_message_html(message, is_user=False) -> str:
+    """Build a message's chat bubble once and keep the HTML on the message for later reruns"""
+    if "html" not in message:
+        template = USER_MESSAGE_TEMPLATE if is_user else INTERVIEWER_MESSAGE_TEMPLATE
+        message["html"] = template.substitute(content=bubble_content(message['content']))
+    return message["html"]
 
 def display_interview_message(message, is_user=False):
     """Display interview message with styling"""
-    if is_user:
-        st.markdown(
-            f"""
-            <div style="
-                display: flex;
-                justify-content: flex-end;
-                margin: 1rem 0;
-            ">
-                <div style="
-                    background-color: #2E8B57;
-                    color: white;
-                    padding: 0.75rem 1rem;
-                    border-radius: 1rem 1rem 0.25rem 1rem;
-                    max-width: 70%;
-                    word-wrap: break-word;
-                ">
-                    <strong>🎯 You:</strong><br>{message['content']}
-                </div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-    else:
-        st.markdown(
-            f"""
-            <div style="
-                display: flex;
-                justify-content: flex-start;
-                margin: 1rem 0;
-            ">
-                <div style="
-                    background-color: #4A4A4A;
-                    color: white;
-                    padding: 0.75rem 1rem;
-                    border-radius: 1rem 1rem 1rem 0.25rem;
-                    max-width: 70%;
-                    word-wrap: break-word;
-                    border-left: 3px solid #FFA500;
-                ">
-                    <strong>👨‍💼 Interviewer:</strong><br>{message['content']}
-                </div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+    st.markdown(interview_message_html(message, is_user), unsafe_allow_html=True)
 
+def add_interview_message(message: Dict):
+    """Add a message to the interview history and its API-ready mirror"""
+    st.session_state.interview_messages.append(message)
+    st.session_state.api_messages.append({"role": message["role"], "content": message["content"]})
+
+@st.cache_data(show_spinner=False, max_entries=64)
 def get_job_specific_context(job_role, experience_level, company_type):
     """Generate job-specific context for the interview"""
     return f"""
@@ -602,6 +1066,172 @@ def get_job_specific_context(job_role, experience_level, company_type):
     Please conduct an interview appropriate for this role and level. Start with an opening question.
     """
 
+def render_while_streaming(sentences, container):
+    """Pass the coach's sentences through while showing the reply as it grows in the chat"""
+    placeholder = container.empty()
+    text = ""
+    for sentence in sentences:
+        text += sentence
+        placeholder.markdown(INTERVIEWER_MESSAGE_TEMPLATE.substitute(content=bubble_content(text)), unsafe_allow_html=True)
+        yield sentence
+
+def request_coach_message(api_messages: List[Dict], model_name: str, speak: bool,
+                          cache_key: Optional[str] = None, avatar: bool = False, container=None) -> Dict:
+    """
+    Get the coach's next message. When speak is set, each sentence is sent to TTS as soon as
+    it is generated; with speaker playback, speech overlaps the rest of the generation, while
+    browser playback starts once the whole reply is synthesized. When avatar is set, the
+    avatar job is submitted right away so Azure renders it while the message is added and drawn.
+    """
+    engine = st.session_state.interview_engine
+    sentences = render_while_streaming(
+        engine.stream_interview_response(api_messages, model_name, cache_key),
+        container or st.container()
+    )
+    if not speak:
+        message = {"role": "assistant", "content": "".join(sentences), "timestamp": time.time()}
+        if avatar:
+            # A job id, or AVATAR_JOB_CACHED / AVATAR_JOB_FAILED
+            message["avatar_job"] = engine.start_avatar_job(message["content"])
+        return message
+    
+    content, audio = engine.speak_while_streaming(sentences)
+    message = {"role": "assistant", "content": content, "timestamp": time.time()}
+    if audio:
+        # Browser playback: the audio is played by the TTS block once the message is on screen
+        message["audio"] = audio
+    elif not engine.mp3_synthesizer:
+        # Speaker playback is already under way; the message is appended at this index next
+        st.session_state.last_spoken_idx = len(st.session_state.interview_messages)
+    # Otherwise browser synthesis failed part-way, and the TTS block speaks the whole message again
+    return message
+
+def speak_latest_message():
+    """Speak the latest assistant message unless it has been spoken already"""
+    latest_message = st.session_state.interview_messages[-1]
+    message_idx = len(st.session_state.interview_messages) - 1
+    if latest_message["role"] != "assistant" or message_idx <= st.session_state.last_spoken_idx:
+        return
+    
+    # Mark the message as spoken once audio starts, so a rerun mid-playback doesn't replay it
+    def mark_spoken():
+        st.session_state.last_spoken_idx = message_idx
+    
+    engine = st.session_state.interview_engine
+    if "audio" in latest_message:
+        # Audio was synthesized while the response was generated
+        mark_spoken()
+        engine.play_audio(latest_message.pop("audio"))
+    elif st.session_state.avatar_enabled:
+        # The job id stays on the message until the avatar has been handled, so a rerun in the middle
+        # of monitoring resumes the same job instead of submitting (and paying for) a new one
+        if "avatar_job" not in latest_message:
+            latest_message["avatar_job"] = engine.start_avatar_job(latest_message['content'])
+        job_id = latest_message["avatar_job"]
+        if job_id not in (AVATAR_JOB_CACHED, AVATAR_JOB_FAILED) and st.session_state.get(_avatar_skip_key(job_id)):
+            # The skip button was clicked while the previous run was monitoring this job
+            st.info("🔊 Continuing with audio-only as requested...")
+            engine.text_to_speech(latest_message['content'], on_start=mark_spoken)
+        else:
+            # Use avatar TTS
+            engine.text_to_speech_avatar(latest_message['content'], True, job_id)
+        latest_message.pop("avatar_job")
+    else:
+        # Use regular TTS
+        engine.text_to_speech(latest_message['content'], on_start=mark_spoken)
+    
+    # Mark this message as spoken
+    mark_spoken()
+
+def render_interview_stats(placeholder):
+    """Show the question count and average score in the sidebar"""
+    with placeholder.container():
+        st.info(f"Questions Asked: {st.session_state.question_count}")
+        
+        if st.session_state.interview_score_count:
+            avg_score = st.session_state.interview_scores[:st.session_state.interview_score_count].mean()
+            st.metric("Average Score", f"{avg_score:.1f}/10")
+
+@st.fragment
+def response_input(use_speech: bool):
+    """Collect the candidate's answer; typing, toggling, and recording only rerun this fragment"""
+    st.markdown("---")
+    st.subheader("Your Response")
+
+    # Response input methods
+    response_method = st.radio(
+        "How would you like to respond?",
+        RESPONSE_METHODS_WITH_SPEECH if use_speech and SPEECH_SDK_AVAILABLE else RESPONSE_METHODS_TEXT_ONLY,
+        horizontal=True
+    )
+
+    user_response = None
+
+    if response_method == "Type Response":
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            typed_response = st.text_area(
+                "Type your answer:",
+                height=100,
+                placeholder="Share your response here..."
+            )
+        with col2:
+            st.write("")  # spacing
+            if st.button("Submit", type="primary"):
+                if typed_response.strip():
+                    user_response = typed_response
+
+    elif response_method == "Speak Response":
+        # Initialize speech recording state
+        if "is_recording" not in st.session_state:
+            st.session_state.is_recording = False
+
+        engine = st.session_state.interview_engine
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            if not st.session_state.is_recording:
+                if st.button("🎤 Start Recording", type="primary", use_container_width=True):
+                    try:
+                        if engine.start_listening():
+                            st.session_state.is_recording = True
+                            st.session_state.recording_started = time.time()
+                            st.rerun(scope="fragment")
+                    except Exception as e:
+                        st.error(f"Recording failed: {str(e)}")
+            else:
+                st.info("🎤 Listening for your response... Speak now!")
+                if st.button("⏹️ Cancel Recording", use_container_width=True):
+                    engine.stop_listening()
+                    st.session_state.is_recording = False
+                    st.rerun(scope="fragment")
+
+        with col2:
+            st.info("💡 **Tips for better recognition:**\n- Speak clearly and at normal pace\n- Ensure good microphone access\n- Minimize background noise\n- Pause briefly when you finish speaking")
+
+        if st.session_state.is_recording:
+            # Recognition runs in the background; each short rerun keeps the page interactive
+            result = engine.poll_transcript()
+            timed_out = time.time() - st.session_state.recording_started > STT_LISTEN_TIMEOUT_SECONDS
+            if result or timed_out:
+                engine.stop_listening()
+                st.session_state.is_recording = False
+                kind, value = result or ("error", "timed out")
+                if kind == "text" and value.strip():
+                    user_response = value.strip()
+                    st.success(f"✅ Recorded: {user_response[:100]}{'...' if len(user_response) > 100 else ''}")
+                elif kind == "error":
+                    st.error(f"Recording failed: {value}")
+                else:
+                    st.warning("No speech was detected. Please try again.")
+            else:
+                time.sleep(STT_POLL_INTERVAL)
+                st.rerun(scope="fragment")
+
+    if user_response:
+        # Hand the answer to a full page run, which records it and gets the coach's feedback
+        st.session_state.pending_response = user_response
+        st.rerun()
+
 def main():
     # Page configuration
     st.set_page_config(
@@ -611,6 +1241,9 @@ def main():
         initial_sidebar_state="expanded"
     )
     
+    # Shared chat bubble styles
+    st.markdown(INTERVIEW_MESSAGE_CSS, unsafe_allow_html=True)
+    
     # Initialize session
     initialize_interview_session()
     
@@ -647,53 +1280,19 @@ def main():
         # Interview Configuration
         st.subheader("Interview Configuration")
         
-        job_role = st.selectbox(
-            "Job Role",
-            [
-                "Software Engineer",
-                "Data Scientist",
-                "Product Manager", 
-                "Marketing Manager",
-                "Sales Representative",
-                "Business Analyst",
-                "UX Designer",
-                "Project Manager",
-                "Customer Success Manager",
-                "Other"
-            ]
-        )
+        job_role = st.selectbox("Job Role", JOB_ROLES)
         
         if job_role == "Other":
             job_role = st.text_input("Specify job role:")
         
         experience_level = st.select_slider(
             "Experience Level",
-            options=["Entry Level", "Mid Level", "Senior Level", "Executive Level"]
+            options=EXPERIENCE_LEVELS
         )
         
-        company_type = st.selectbox(
-            "Company Type",
-            [
-                "Tech Startup",
-                "Large Tech Company",
-                "Fortune 500",
-                "Small Business",
-                "Non-Profit",
-                "Government",
-                "Consulting",
-                "Healthcare",
-                "Financial Services"
-            ]
-        )
+        company_type = st.selectbox("Company Type", COMPANY_TYPES)
         
-        interview_mode = st.radio(
-            "Interview Mode",
-            [
-                "Practice Mode (One question at a time)",
-                "Full Interview (30-45 minutes)",
-                "Quick Prep (5-10 questions)"
-            ]
-        )
+        interview_mode = st.radio("Interview Mode", INTERVIEW_MODES)
         
         st.session_state.interview_mode = interview_mode
         
@@ -703,7 +1302,7 @@ def main():
         st.subheader("AI Configuration")
         model_name = st.selectbox(
             "AI Model",
-            ["gpt-4", "gpt-4-turbo", "gpt-35-turbo", "gpt-4o"],
+            MODEL_OPTIONS,
             help="Choose your Azure OpenAI model"
         )
         
@@ -726,7 +1325,7 @@ def main():
             
             with col2:
                 # Show speech status
-                if st.session_state.interview_engine.is_speaking:
+                if st.session_state.is_speaking:
                     st.markdown("🔊 **Speaking...**")
                 else:
                     st.markdown("🔇 *Silent*")
@@ -735,10 +1334,9 @@ def main():
             st.markdown("** Avatar Settings:**")
             
             # Check if avatar prerequisites are met
-            speech_key = os.getenv("AZURE_SPEECH_KEY")
-            speech_endpoint = os.getenv('SPEECH_ENDPOINT') or SPEECH_ENDPOINT
+            speech_endpoint = SPEECH_ENDPOINT
             
-            if not speech_key:
+            if not SPEECH_KEY:
                 st.warning("⚠️ Azure Speech Key required for Avatar functionality")
                 use_avatar = False
             else:
@@ -753,21 +1351,21 @@ def main():
                 with col1:
                     avatar_character = st.selectbox(
                         "Character",
-                        ["lisa", "jason", "clara", "sarah", "nancy"],
+                        AVATAR_CHARACTERS,
                         help="Avatar character"
                     )
                 
                 with col2:
                     avatar_style = st.selectbox(
                         "Style",
-                        ["casual-sitting", "business-standing", "professional-sitting"],
+                        AVATAR_STYLES,
                         help="Avatar presentation style"
                     )
                 
-                # Update engine settings
-                st.session_state.interview_engine.avatar_enabled = use_avatar
-                st.session_state.interview_engine.avatar_character = avatar_character
-                st.session_state.interview_engine.avatar_style = avatar_style
+                # Update avatar settings
+                st.session_state.avatar_character = avatar_character
+                st.session_state.avatar_style = avatar_style
+            st.session_state.avatar_enabled = use_avatar
         
         st.markdown("---")
         
@@ -778,26 +1376,34 @@ def main():
             if st.button("🚀 Start Interview", type="primary", use_container_width=True):
                 # Initialize interview
                 context = get_job_specific_context(job_role, experience_level, company_type)
+                # Static coach prompt first and verbatim, so the prefix stays prompt-cache eligible;
+                # the job context follows as a separate (hidden) user message
                 st.session_state.interview_messages = [
-                    {"role": "system", "content": INTERVIEW_COACH_SYSTEM_PROMPT + "\n" + context}
+                    {"role": "system", "content": INTERVIEW_COACH_SYSTEM_PROMPT},
+                    {"role": "user", "content": context, "is_context": True}
+                ]
+                st.session_state.api_messages = [
+                    {"role": msg["role"], "content": msg["content"]} for msg in st.session_state.interview_messages
                 ]
                 st.session_state.interview_started = True
                 st.session_state.question_count = 0
+                st.session_state.last_spoken_idx = -1
                 st.rerun()
         else:
             if st.button("🔄 Reset Interview", type="secondary", use_container_width=True):
                 st.session_state.interview_messages = []
+                st.session_state.api_messages = []
                 st.session_state.interview_started = False
                 st.session_state.question_count = 0
-                st.session_state.interview_scores = []
+                st.session_state.last_spoken_idx = -1
+                st.session_state.interview_scores[:] = 0
+                st.session_state.interview_score_count = 0
                 st.rerun()
         
+        # Refreshed again after the page's turn handling, so a new answer's score shows without a rerun
+        stats_placeholder = st.empty()
         if st.session_state.interview_started:
-            st.info(f"Questions Asked: {st.session_state.question_count}")
-            
-            if st.session_state.interview_scores:
-                avg_score = sum(st.session_state.interview_scores) / len(st.session_state.interview_scores)
-                st.metric("Average Score", f"{avg_score:.1f}/10")
+            render_interview_stats(stats_placeholder)
     
     # Main Interview Area
     if not st.session_state.interview_started:
@@ -847,7 +1453,7 @@ def main():
         """)
         
         # Show avatar status if configured
-        if os.getenv("AZURE_SPEECH_KEY"):
+        if SPEECH_KEY:
             st.success("Azure Avatar functionality available!")
         else:
             st.info("💡 Add AZURE_SPEECH_KEY to .env file to enable Avatar features")
@@ -861,8 +1467,11 @@ def main():
         # Display conversation
         interview_container = st.container()
         
+        # Pick up whether sentences queued on the speaker during an earlier turn are still playing
+        st.session_state.interview_engine.check_queued_speech()
+        
         # Show prominent stop button and visual indicator when speech is active
-        if hasattr(st.session_state.interview_engine, 'is_speaking') and st.session_state.interview_engine.is_speaking:
+        if st.session_state.is_speaking:
             st.warning("🔊 AI is currently speaking...")
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
@@ -871,180 +1480,130 @@ def main():
                     st.rerun()
         
         with interview_container:
-            for message in st.session_state.interview_messages:
-                if message["role"] in ["user", "assistant"]:
-                    display_interview_message(message, is_user=(message["role"] == "user"))
+            # The whole history goes out as one markdown element instead of one per message
+            history_html = "".join(
+                interview_message_html(message, is_user=(message["role"] == "user"))
+                for message in st.session_state.interview_messages
+                if message["role"] in ["user", "assistant"] and not message.get("is_context")
+            )
+            if history_html:
+                st.markdown(history_html, unsafe_allow_html=True)
         
         # Handle TTS for the latest assistant message if it hasn't been spoken yet
-        if (st.session_state.interview_messages and 
-            st.session_state.interview_messages[-1]["role"] == "assistant" and
-            use_tts and SPEECH_SDK_AVAILABLE and
-            not hasattr(st.session_state, 'last_spoken_message_id')):
-            
-            # Get the latest assistant message
-            latest_message = st.session_state.interview_messages[-1]
-            message_id = id(latest_message)  # Use object id as unique identifier
-            
-            # Check if this message has already been spoken
-            if not hasattr(st.session_state, 'spoken_message_ids'):
-                st.session_state.spoken_message_ids = set()
-            
-            if message_id not in st.session_state.spoken_message_ids:
-                avatar_enabled = getattr(st.session_state.interview_engine, 'avatar_enabled', False)
-                if avatar_enabled:
-                    # Use avatar TTS
-                    st.session_state.interview_engine.text_to_speech_avatar(latest_message['content'], True)
-                else:
-                    # Use regular TTS
-                    st.session_state.interview_engine.text_to_speech(latest_message['content'])
-                
-                # Mark this message as spoken
-                st.session_state.spoken_message_ids.add(message_id)
+        # (speak_latest_message skips anything but an unspoken assistant message)
+        if use_tts and SPEECH_SDK_AVAILABLE and st.session_state.interview_messages:
+            speak_latest_message()
+        
+        # Stream coach responses straight into TTS unless the avatar (which needs the full text) is on
+        pipeline_tts = (use_tts and SPEECH_SDK_AVAILABLE and
+                        not st.session_state.avatar_enabled)
+        # With the avatar on, its render job is submitted as soon as the response text is complete,
+        # before the message is drawn and speak_latest_message starts monitoring it
+        avatar_tts = use_tts and SPEECH_SDK_AVAILABLE and st.session_state.avatar_enabled
         
         # Generate first question if just started
-        if len(st.session_state.interview_messages) == 1:  # Only system message
+        if len(st.session_state.interview_messages) == 2:  # Only system prompt and job context
             with st.spinner("Interview coach is preparing your first question..."):
                 first_question_prompt = "Please start the interview with an appropriate opening question."
                 
-                # Prepare clean API messages (only role and content, no timestamp)
-                api_messages = [{"role": msg["role"], "content": msg["content"]} 
-                               for msg in st.session_state.interview_messages 
-                               if "role" in msg and "content" in msg]
-                api_messages.append({"role": "user", "content": first_question_prompt})
+                api_messages = st.session_state.api_messages + [{"role": "user", "content": first_question_prompt}]
                 
-                response = st.session_state.interview_engine.get_interview_response(api_messages, model_name)
+                coach_message = request_coach_message(
+                    api_messages, model_name, speak=pipeline_tts,
+                    cache_key=f"{job_role}|{experience_level}|{company_type}",
+                    avatar=avatar_tts,
+                    container=interview_container
+                )
+                response = coach_message["content"]
                 
                 # Ensure we have a complete response before proceeding
                 if response and response.strip():
-                    st.session_state.interview_messages.append({
-                        "role": "assistant",
-                        "content": response,
-                        "timestamp": datetime.now()
-                    })
+                    add_interview_message(coach_message)
                     
                     st.session_state.question_count += 1
-                    
-                    # Force rerun to display the message before TTS
-                    st.rerun()
                 else:
                     st.error("Failed to generate opening question. Please try again.")
                     return
             
-            # This will be handled after rerun in the TTS section below
+            # The question is already on screen, so speak it now instead of rerunning the page
+            if use_tts and SPEECH_SDK_AVAILABLE:
+                speak_latest_message()
+            render_interview_stats(stats_placeholder)
         
         # Get user response if last message is from assistant
         if (st.session_state.interview_messages and 
             st.session_state.interview_messages[-1]["role"] == "assistant"):
             
-            st.markdown("---")
-            st.subheader("Your Response")
-            
-            # Response input methods
-            response_method = st.radio(
-                "How would you like to respond?",
-                ["Type Response", "Speak Response"] if use_speech and SPEECH_SDK_AVAILABLE else ["Type Response"],
-                horizontal=True
-            )
-            
-            user_response = None
-            
-            if response_method == "Type Response":
-                col1, col2 = st.columns([4, 1])
-                with col1:
-                    typed_response = st.text_area(
-                        "Type your answer:",
-                        height=100,
-                        placeholder="Share your response here..."
-                    )
-                with col2:
-                    st.write("")  # spacing
-                    if st.button("Submit", type="primary"):
-                        if typed_response.strip():
-                            user_response = typed_response
-            
-            elif response_method == "Speak Response":
-                # Initialize speech recording state
-                if "is_recording" not in st.session_state:
-                    st.session_state.is_recording = False
-                
-                col1, col2 = st.columns([1, 1])
-                with col1:
-                    # Disable button while recording to prevent multiple concurrent calls
-                    if st.button(
-                        "🎤 Start Recording" if not st.session_state.is_recording else "🎤 Recording...", 
-                        type="primary", 
-                        use_container_width=True,
-                        disabled=st.session_state.is_recording
-                    ):
-                        st.session_state.is_recording = True
-                        try:
-                            with st.spinner("🎤 Listening for your response... Speak now!"):
-                                spoken_response = st.session_state.interview_engine.speech_to_text()
-                                if spoken_response and spoken_response.strip():
-                                    user_response = spoken_response
-                                    st.success(f"✅ Recorded: {spoken_response[:100]}{'...' if len(spoken_response) > 100 else ''}")
-                                else:
-                                    st.warning("No speech was detected. Please try again.")
-                        except Exception as e:
-                            st.error(f"Recording failed: {str(e)}")
-                        finally:
-                            st.session_state.is_recording = False
-                
-                with col2:
-                    st.info("💡 **Tips for better recognition:**\n- Speak clearly and at normal pace\n- Ensure good microphone access\n- Minimize background noise\n- Pause briefly when you finish speaking")
-            
+            response_input(use_speech)
+            # An answer submitted in the fragment arrives with the full page rerun it triggers
+            user_response = st.session_state.pop("pending_response", None)
+
             # Process user response
             if user_response:
                 # Add user message
-                st.session_state.interview_messages.append({
+                user_message = {
                     "role": "user",
                     "content": user_response,
-                    "timestamp": datetime.now()
-                })
+                    "timestamp": time.time()
+                }
+                add_interview_message(user_message)
+                with interview_container:
+                    display_interview_message(user_message, is_user=True)
+        
+        # Feedback is owed whenever the candidate's answer is the latest message, so a rerun that
+        # interrupted the previous attempt mid-stream generates it again instead of waiting forever
+        latest_message = st.session_state.interview_messages[-1] if st.session_state.interview_messages else None
+        if latest_message and latest_message["role"] == "user" and not latest_message.get("is_context"):
+            user_response = latest_message["content"]
+            # Get feedback and next question
+            with st.spinner("Getting feedback and next question..."):
+                feedback_prompt = f"""
+                Please provide detailed feedback on this response and then ask the next appropriate interview question.
+                Your response will be read so don't return symbols like #, ?, / or any other non-verbal characters.
+                Response to evaluate: "{user_response}"
                 
-                # Get feedback and next question
-                with st.spinner("Getting feedback and next question..."):
-                    feedback_prompt = f"""
-                    Please provide detailed feedback on this response and then ask the next appropriate interview question.
-                    Your response will be read so don't return symbols like #, ?, / or any other non-verbal characters.
-                    Response to evaluate: "{user_response}"
-                    
-                    Include:
-                    1. Feedback with score (1-10) for content, clarity, and overall effectiveness
-                    2. Specific improvement suggestions
-                    3. What they did well
-                    4. Next interview question appropriate for the flow
-                    """
-                    
-                    # Prepare clean API messages (only role and content, no timestamp)
-                    api_messages = [{"role": msg["role"], "content": msg["content"]} 
-                                   for msg in st.session_state.interview_messages 
-                                   if "role" in msg and "content" in msg]
-                    api_messages.append({"role": "user", "content": feedback_prompt})
+                Include:
+                1. Feedback with score (1-10) for content, clarity, and overall effectiveness
+                2. Specific improvement suggestions
+                3. What they did well
+                4. Next interview question appropriate for the flow
+                """
+                
+                api_messages = st.session_state.api_messages + [{"role": "user", "content": feedback_prompt}]
+                
+                # Not cached: feedback and its score must come from this candidate's answer
+                coach_message = request_coach_message(
+                    api_messages, model_name, speak=pipeline_tts,
+                    avatar=avatar_tts,
+                    container=interview_container
+                )
+                coach_response = coach_message["content"]
+                
+                # Ensure we have a complete response before proceeding
+                if coach_response and coach_response.strip():
+                    add_interview_message(coach_message)
                     
-                    coach_response = st.session_state.interview_engine.get_interview_response(api_messages, model_name)
+                    st.session_state.question_count += 1
                     
-                    # Ensure we have a complete response before proceeding
-                    if coach_response and coach_response.strip():
-                        st.session_state.interview_messages.append({
-                            "role": "assistant", 
-                            "content": coach_response,
-                            "timestamp": datetime.now()
-                        })
-                        
-                        st.session_state.question_count += 1
-                        
-                        # Extract score if present (simple regex for score tracking)
-                        import re
-                        score_match = re.search(r'score[:\s]*([0-9]+)', coach_response.lower())
-                        if score_match:
-                            score = int(score_match.group(1))
-                            st.session_state.interview_scores.append(score)
-                        
-                        # Force rerun to display the message before TTS
-                        st.rerun()
-                    else:
-                        st.error("Failed to generate feedback. Please try again.")
+                    # Extract score if present (simple regex for score tracking)
+                    score_match = _SCORE_RE.search(coach_response)
+                    score_count = st.session_state.interview_score_count
+                    if score_match and score_count < MAX_SCORED_ANSWERS:
+                        score = int(score_match.group(1))
+                        # Only scores on the coach's 10-point scale; also keeps the value within int8
+                        if score <= 10:
+                            st.session_state.interview_scores[score_count] = score
+                            st.session_state.interview_score_count += 1
+                else:
+                    st.error("Failed to generate feedback. Please try again.")
+                    # The click reruns the page, and the answer still being latest asks for feedback again
+                    st.button("🔁 Retry feedback", key="retry_feedback")
+            
+            # The feedback is already on screen, so speak it now instead of rerunning the page
+            if use_tts and SPEECH_SDK_AVAILABLE:
+                speak_latest_message()
+            
+            render_interview_stats(stats_placeholder)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,19 +7,21 @@ This script helps set up the Career Buddy application environment.
 import subprocess
 import sys
 import os
+import shutil
 from pathlib import Path
 
 def run_command(command, description):
     """Run a command and handle errors"""
     print(f"\n📦 {description}...")
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        # Output is not captured, so installer progress streams straight to the terminal
+        subprocess.run(command, shell=True, check=True)
         print(f"✅ {description} completed successfully!")
         return True
     except subprocess.CalledProcessError as e:
         print(f"❌ Error during {description}:")
         print(f"Command: {command}")
-        print(f"Error: {e.stderr}")
+        print(f"Exit code: {e.returncode} (see the output above)")
         return False
 
 def check_python_version():
@@ -35,15 +37,13 @@ def check_python_version():
 
 def install_dependencies():
     """Install Python dependencies"""
-    commands = [
-        ("pip install agent-framework-azure-ai --pre", "Installing Microsoft Agent Framework (preview)"),
-        ("pip install -r requirements.txt", "Installing other dependencies"),
-    ]
-    
-    for command, description in commands:
-        if not run_command(command, description):
-            return False
-    return True
+    # One resolver run for everything, including the preview Agent Framework, which requirements.txt
+    # pins with a pre-release specifier; uv is used when available since it resolves and installs much faster
+    if shutil.which("uv"):
+        command = f'uv pip install --python "{sys.executable}" --prerelease=if-necessary-or-explicit -r requirements.txt'
+    else:
+        command = "pip install -r requirements.txt"
+    return run_command(command, "Installing dependencies")
 
 def setup_environment_file():
     """Setup environment configuration file"""